@@ -1,6 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.core.security import decode_access_token
+from backend.database.db_config import get_db
+from backend.services.database import DatabaseManager
 from shared.schemas import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -22,3 +25,6 @@ async def get_admin_user(current_user: dict = Depends(get_current_user)):
             detail="Insufficient permissions"
         )
     return current_user
+
+async def get_db_manager(db: AsyncSession = Depends(get_db)) -> DatabaseManager:
+    return DatabaseManager(db)
@@ -1,27 +1,156 @@
-from fastapi import APIRouter, HTTPException, Body, Depends
-from backend.services.database import DatabaseManager
-from backend.api.deps import get_admin_user
-from shared.schemas import SignupStatus, TimesheetStatus
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Body, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from backend.services.database import DatabaseManager, user_cache
+from backend.api.deps import get_admin_user, get_db_manager
+from backend.utils.helpers import encode_cursor, decode_cursor
+from backend.database.db_config import get_pool_status
+from backend.core.security import token_cache
+from backend.services.audit import audit_log
+from shared.schemas import SignupStatus, TimesheetStatus, BulkProcessRequest, SubmissionsPage, ReviewQueuePage
+from datetime import datetime, date
+import csv
+import io
 import json
+import os
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
-db_manager = DatabaseManager()
 
-@router.get("/submissions")
-async def admin_get_submissions(_: dict = Depends(get_admin_user)):
-    return await db_manager.get_all_submissions()
+EXPORT_COLUMNS = [
+    "entry_id", "employee_id", "email", "week_start_date", "date", "hours", "project_name",
+    "task_description", "work_type", "timesheet_id", "approved_at", "approved_by"
+]
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+@router.get("/submissions", response_model=SubmissionsPage)
+async def admin_get_submissions(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200, description="Weeks per page"),
+    week_from: Optional[date] = None,
+    week_to: Optional[date] = None,
+    employee_id: Optional[str] = None,
+    project: Optional[str] = None,
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    _: dict = Depends(get_admin_user)
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items, next_after = await db_manager.get_all_submissions(after, limit, week_from, week_to, employee_id, project)
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(*next_after) if next_after else None
+    }
+
+@router.get("/queue", response_model=ReviewQueuePage)
+async def admin_get_review_queue(
+    cursor: Optional[str] = None,
+    limit: int = Query(25, ge=1, le=200, description="Weeks per page"),
+    week_from: Optional[date] = None,
+    week_to: Optional[date] = None,
+    employee_id: Optional[str] = None,
+    project: Optional[str] = None,
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    _: dict = Depends(get_admin_user)
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items, next_after = await db_manager.get_review_queue(after, limit, week_from, week_to, employee_id, project)
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(*next_after) if next_after else None
+    }
 
 @router.post("/timesheets/process")
 async def admin_process_timesheet(
     email: str = Body(...),
     week_start: str = Body(...),
     action: str = Body(...),
-    admin_email: str = Body(...),
+    admin_email: Optional[str] = Body(None),
     reason: str = Body(""),
-    _: dict = Depends(get_admin_user)
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    admin: dict = Depends(get_admin_user)
 ):
-    success, message = await db_manager.process_timesheet_week(email, week_start, action, admin_email, reason)
+    # The reviewer is whoever holds the token; admin_email is only accepted for older clients
+    if admin_email is not None and admin_email.lower() != admin["sub"].lower():
+        raise HTTPException(status_code=403, detail="admin_email does not match the signed-in admin")
+    success, message = await db_manager.process_timesheet_week(email, week_start, action, admin["sub"], reason)
     if not success:
         raise HTTPException(status_code=400, detail=message)
     return {"message": message}
+
+@router.post("/timesheets/process/bulk")
+async def admin_process_timesheets_bulk(
+    request: BulkProcessRequest,
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    admin: dict = Depends(get_admin_user)
+):
+    """Applies every decision in one transaction, as the authenticated admin, and reports the outcome of each."""
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No decisions provided")
+    results = await db_manager.process_timesheet_weeks(request.items, admin["sub"])
+    processed = sum(1 for r in results if r["success"])
+    return {
+        "message": f"{processed} of {len(results)} weeks processed",
+        "results": results
+    }
+
+@router.get("/export")
+async def admin_export_approved(
+    start: date,
+    end: date,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    _: dict = Depends(get_admin_user)
+):
+    """Streams every approved entry dated between start and end (inclusive) as CSV or NDJSON."""
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+
+    async def generate():
+        # One chunk per cursor batch keeps memory flat regardless of export size
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            async for rows in db_manager.stream_approved_entries(start, end):
+                writer.writerows([[_export_value(row[c]) for c in EXPORT_COLUMNS] for row in rows])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            async for rows in db_manager.stream_approved_entries(start, end):
+                yield "".join(
+                    json.dumps({c: _export_value(row[c]) for c in EXPORT_COLUMNS}) + "\n" for row in rows
+                )
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"approved_timesheets_{start.isoformat()}_{end.isoformat()}.{fmt}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/stats/pool")
+async def admin_pool_stats(_: dict = Depends(get_admin_user)):
+    """Connection pool usage for the worker process that served this request."""
+    return {"pid": os.getpid(), **get_pool_status()}
+
+@router.get("/stats/caches")
+async def admin_cache_stats(_: dict = Depends(get_admin_user)):
+    """Hit/miss counters of this worker process's in-memory caches."""
+    return {"pid": os.getpid(), "users": user_cache.stats(), "tokens": token_cache.stats()}
+
+@router.get("/stats/audit")
+async def admin_audit_stats(_: dict = Depends(get_admin_user)):
+    """Audit log queue depth and write/drop counters for the worker process that served this request."""
+    return {"pid": os.getpid(), **audit_log.stats()}
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Depends
 from datetime import datetime
 from backend.services.database import DatabaseManager
+from backend.api.deps import get_db_manager
 from backend.core.security import create_access_token
-from shared.schemas import UserStatus
+from shared.schemas import UserStatus, LoginResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-db_manager = DatabaseManager()
 
 @router.post("/register")
 async def register(
@@ -13,7 +13,8 @@ async def register(
     password: str = Body(...),
     role: str = Body(...),
     full_name: str = Body(...),
-    employee_id: str = Body(...)
+    employee_id: str = Body(...),
+    db_manager: DatabaseManager = Depends(get_db_manager)
 ):
     # Check if user already exists
     if await db_manager.get_user_by_email(email):
@@ -38,8 +39,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-@router.post("/login")
-async def login(email: str = Body(...), password: str = Body(...)):
+@router.post("/login", response_model=LoginResponse)
+async def login(email: str = Body(...), password: str = Body(...), db_manager: DatabaseManager = Depends(get_db_manager)):
     logger.info(f"Login attempt for: {email}")
     try:
         user = await db_manager.get_user_by_email(email)
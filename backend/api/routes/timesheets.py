@@ -1,17 +1,34 @@
 from typing import Optional
 from backend.utils.helpers import get_current_week_start
-from backend.api.deps import get_current_user
-from fastapi import APIRouter, HTTPException, Body, Depends
-from shared.schemas import TimesheetStatus, TimesheetEntry
+from backend.api.deps import get_current_user, get_db_manager
+from fastapi import APIRouter, HTTPException, Body, Depends, Header, Response
+from shared.schemas import TimesheetStatus, TimesheetEntry, WeekBatchRequest, CurrentWeekResponse
 from datetime import datetime, timedelta
 from backend.services.database import DatabaseManager
+import hashlib
 import uuid
 
 router = APIRouter(prefix="/timesheets", tags=["Timesheets"])
-db_manager = DatabaseManager()
 
-@router.get("/current")
-async def get_current_timesheet(email: str, week_start: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+def _week_etag(email: str, week_start, version: tuple) -> str:
+    raw = "|".join([email, week_start.isoformat()] + [str(part) for part in version])
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+@router.get("/current", response_model=CurrentWeekResponse)
+async def get_current_timesheet(
+    email: str,
+    response: Response,
+    week_start: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db_manager: DatabaseManager = Depends(get_db_manager),
+    current_user: dict = Depends(get_current_user)
+):
     if email != current_user["sub"]:
         raise HTTPException(status_code=403, detail="Forbidden: You can only view your own timesheet")
     
@@ -19,9 +36,16 @@ async def get_current_timesheet(email: str, week_start: Optional[str] = None, cu
         w_start = get_current_week_start()
     else:
         w_start = datetime.strptime(week_start, "%Y-%m-%d").date()
-        
+
+    # Streamlit reruns poll this constantly; answer unchanged weeks from one aggregate query
+    etag = _week_etag(email, w_start, await db_manager.get_week_version(email, w_start))
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
     entries = await db_manager.get_pending_entries(email, w_start.isoformat())
-    return {"week_start": w_start.isoformat(), "entries": entries}
+    week = await db_manager.get_week_summary(email, w_start.isoformat())
+    response.headers["ETag"] = etag
+    return {"week_start": w_start.isoformat(), "week": week, "entries": entries}
 
 @router.post("/entry")
 async def save_entry(
@@ -31,6 +55,7 @@ async def save_entry(
     project_name: str = Body(...),
     task_description: str = Body(...),
     work_type: str = Body("Billable"),
+    db_manager: DatabaseManager = Depends(get_db_manager),
     current_user: dict = Depends(get_current_user)
 ):
     if email != current_user["sub"]:
@@ -72,6 +97,7 @@ async def update_entry(
     project_name: str = Body(...),
     task_description: str = Body(...),
     work_type: str = Body(...),
+    db_manager: DatabaseManager = Depends(get_db_manager),
     current_user: dict = Depends(get_current_user)
 ):
     if email != current_user["sub"]:
@@ -82,8 +108,28 @@ async def update_entry(
         raise HTTPException(status_code=400, detail=message)
     return {"message": message}
 
+@router.post("/week/batch")
+async def save_week_batch(batch: WeekBatchRequest, db_manager: DatabaseManager = Depends(get_db_manager), current_user: dict = Depends(get_current_user)):
+    if batch.email != current_user["sub"]:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    from backend.config import settings
+
+    if batch.week_start.weekday() != 0:
+        raise HTTPException(status_code=400, detail="week_start must be a Monday")
+
+    for item in list(batch.creates) + list(batch.updates):
+        if item.hours < 0 or item.hours > settings.MAX_DAILY_HOURS:
+            raise HTTPException(status_code=400, detail=f"Invalid hours (0-{settings.MAX_DAILY_HOURS})")
+
+    success, message = await db_manager.save_week_batch(
+        batch.email, batch.week_start, batch.creates, batch.updates, batch.deletes
+    )
+    if not success:
+        raise HTTPException(status_code=400, detail=message)
+    return {"message": message}
+
 @router.post("/submit")
-async def submit_timesheet(email: str = Body(...), week_start: str = Body(...), current_user: dict = Depends(get_current_user)):
+async def submit_timesheet(email: str = Body(...), week_start: str = Body(...), db_manager: DatabaseManager = Depends(get_db_manager), current_user: dict = Depends(get_current_user)):
     if email != current_user["sub"]:
         raise HTTPException(status_code=403, detail="Forbidden")
     success = await db_manager.submit_week(email, week_start)
@@ -95,6 +141,7 @@ async def submit_timesheet(email: str = Body(...), week_start: str = Body(...),
 async def delete_entry(
     entry_id: str = Body(..., embed=True),
     email: str = Body(..., embed=True),
+    db_manager: DatabaseManager = Depends(get_db_manager),
     current_user: dict = Depends(get_current_user)
 ):
     if email != current_user["sub"]:
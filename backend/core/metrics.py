@@ -0,0 +1,91 @@
+"""
+Prometheus metrics per route: request latency, status codes, in-flight requests and DB time.
+
+Labels use the route template (e.g. "/timesheets/current"), never the raw path,
+so cardinality stays fixed: unmatched paths and unknown methods each share one
+label value. Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory
+before the workers start; every worker then writes its samples there and
+`/metrics` sums them, whichever worker serves the scrape. Call
+`mark_worker_dead(pid)` from gunicorn's child_exit hook so dead workers stop
+counting towards the in-flight gauge.
+"""
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from backend.database.query_stats import track_queries
+import os
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to the end of the response body.", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+# Unlabelled: the route is only known once the router has matched the request
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being served.", multiprocess_mode="livesum"
+)
+DB_TIME = Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request.", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Counter(
+    "http_request_db_queries_total", "SQL statements executed by requests.", ["method", "route"]
+)
+
+UNMATCHED = "unmatched"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+def route_template(scope) -> str:
+    """Path template of the route that served the request; the router records it in the scope."""
+    return getattr(scope.get("route"), "path", None) or UNMATCHED
+
+def render_metrics() -> tuple:
+    """(body, content type) of the current metrics, aggregated across workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_dead(pid: int):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+class MetricsMiddleware:
+    """Records every HTTP request under its route template; a pure ASGI middleware so it adds no task hops."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            with track_queries() as stats:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            route = route_template(scope)
+            LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status)).inc()
+            DB_TIME.labels(method, route).observe(stats.duration)
+            if stats.count:
+                DB_QUERIES.labels(method, route).inc(stats.count)
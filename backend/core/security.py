@@ -1,6 +1,14 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from backend.config import settings
+from backend.utils.cache import AsyncTTLCache
+import hashlib
+import time
+
+# Streamlit reruns resend the same token many times a minute. Verified payloads are
+# kept until the token expires (or the TTL passes), keyed by a hash of the token so
+# the raw bearer tokens are never held in memory longer than the request.
+token_cache = AsyncTTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -9,8 +17,15 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
 
 def decode_access_token(token: str):
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
     except JWTError:
         return None
+    remaining = payload["exp"] - time.time() if "exp" in payload else None
+    if remaining is None or remaining > 0:
+        token_cache.set(key, payload, ttl=remaining)
+    return dict(payload)
@@ -1,6 +1,11 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import exc
 from backend.config import settings
+from backend.database.query_stats import instrument_engine
+from backend.database.slow_queries import instrument_slow_queries
+import time
 
 # For Neon/Postgres, we use the DATABASE_URL from settings
 DATABASE_URL = settings.DATABASE_URL
@@ -20,13 +25,64 @@ if "?" in DATABASE_URL:
     params = [p for p in query_params.split("&") if not any(p.startswith(bad) for bad in problematic)]
     DATABASE_URL = base_url + ("?" + "&".join(params) if params else "")
 
+class PoolStats:
+    """Checkout wait times for this process's pool."""
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+pool_stats = PoolStats()
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited, including opening new connections."""
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - started, timed_out)
+
+def get_pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "checkouts": pool_stats.checkouts,
+        "checkout_timeouts": pool_stats.timeouts,
+        "avg_checkout_wait_ms": round(1000 * pool_stats.total_wait / pool_stats.checkouts, 3) if pool_stats.checkouts else 0.0,
+        "max_checkout_wait_ms": round(1000 * pool_stats.max_wait, 3)
+    }
+
 engine = create_async_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     connect_args={"ssl": True} if "localhost" not in DATABASE_URL and "127.0.0.1" not in DATABASE_URL else {}
 )
 
+# Statement counts and DB time per request (X-DB-Queries / Server-Timing) and for query budgets
+instrument_engine(engine)
+instrument_slow_queries(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -38,8 +94,15 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 async def get_db():
+    """
+    One session per request. Its connection is checked out on first use and kept
+    until the request finishes; anything left uncommitted is rolled back.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
+        except Exception:
+            await session.rollback()
+            raise
         finally:
             await session.close()
@@ -0,0 +1,200 @@
+"""
+Versioned schema migrations.
+
+Each migration has a version number and is recorded in the `schema_version` table
+once applied. On startup `ensure_schema` reads the highest recorded version in a
+single query and runs no DDL at all when it is current; otherwise it applies the
+pending migrations under an advisory lock, so concurrently starting workers apply
+them once. Migrations in HEAVY_MIGRATIONS build indexes or rewrite whole tables
+and can take minutes, longer than a worker may spend starting up, so on a
+populated database the server refuses to start until they have been applied with:
+
+    python -m backend.database.migrations
+
+Rules for new migrations: append with the next version number, never edit one
+that has shipped, and keep every statement idempotent (IF NOT EXISTS, ON CONFLICT
+DO NOTHING). Version 1 creates the tables from the models, so on a fresh database
+the later migrations find their indexes already in place and do nothing.
+"""
+import asyncio
+import logging
+import re
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from backend.database.db_config import engine
+from backend.database.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Any constant shared by every process; serialises migration runs across workers
+MIGRATION_LOCK_ID = 7_431_902
+UNDEFINED_TABLE = "42P01"
+
+# Builds the week header rows for weeks saved before timesheet_weeks existed.
+# A week counts as Submitted/Approved/Denied if any of its entries is, in that order,
+# which is how the dashboards derived week status from entries.
+BACKFILL_TIMESHEET_WEEKS = """
+INSERT INTO timesheet_weeks (email, week_start_date, status, entry_count, total_hours, billable_hours, holiday_hours,
+                             mon_hours, tue_hours, wed_hours, thu_hours, fri_hours, sat_hours, sun_hours, updated_at)
+SELECT email, week_start_date,
+       CASE WHEN bool_or(status = 'Submitted') THEN 'Submitted'
+            WHEN bool_or(status = 'Approved') THEN 'Approved'
+            WHEN bool_or(status = 'Denied') THEN 'Denied'
+            ELSE 'Draft' END,
+       count(*),
+       coalesce(sum(hours), 0),
+       coalesce(sum(hours) FILTER (WHERE work_type <> 'Holiday'), 0),
+       coalesce(sum(hours) FILTER (WHERE work_type = 'Holiday'), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 0), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 1), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 2), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 3), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 4), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 5), 0),
+       coalesce(sum(hours) FILTER (WHERE date - week_start_date = 6), 0),
+       max(updated_at)
+FROM timesheet_entries
+GROUP BY email, week_start_date
+ON CONFLICT (email, week_start_date) DO NOTHING
+"""
+
+CREATE_SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+def create_tables(sync_conn):
+    Base.metadata.create_all(sync_conn)
+
+# (version, description, statements). A statement is SQL, or a callable run with the
+# sync connection. Everything runs in autocommit: CREATE INDEX CONCURRENTLY cannot run
+# inside a transaction block, and it keeps timesheet_entries writable while indexes build.
+MIGRATIONS = [
+    (1, "Create tables", [create_tables]),
+    (2, "Per-employee and review-queue indexes on timesheet_entries", [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_timesheet_entries_email_week_start_date "
+        "ON timesheet_entries (email, week_start_date)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_timesheet_entries_email_date "
+        "ON timesheet_entries (email, date)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_timesheet_entries_submitted "
+        "ON timesheet_entries (week_start_date, email) WHERE status = 'Submitted'",
+        "ANALYZE timesheet_entries",
+    ]),
+    (3, "Backfill timesheet_weeks and index submitted weeks", [
+        BACKFILL_TIMESHEET_WEEKS,
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_timesheet_weeks_submitted "
+        "ON timesheet_weeks (week_start_date, email) WHERE status = 'Submitted'",
+        "ANALYZE timesheet_weeks",
+    ]),
+    (4, "Approval lookup index", [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_approved_timesheets_email_week_start_date "
+        "ON approved_timesheets (email, week_start_date)",
+    ]),
+    (5, "Audit log table", [create_tables]),
+    # The composite indexes cover email lookups, and the review queue pages through
+    # timesheet_weeks, so these only cost every entry write. Dropping scans nothing.
+    (6, "Drop redundant timesheet_entries indexes", [
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_timesheet_entries_email",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_timesheet_entries_submitted",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Scan, backfill or index whole tables. Cheap on a new database, where version 1 has
+# just created the tables and their indexes, so startup only runs them there.
+HEAVY_MIGRATIONS = {2, 3, 4}
+
+CONCURRENT_INDEX = re.compile(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+)")
+
+async def drop_invalid_indexes(conn, statements):
+    """
+    An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which
+    IF NOT EXISTS would then skip forever. Drops those among the indexes `statements` build.
+    """
+    names = [m.group(1) for m in (CONCURRENT_INDEX.search(s) for s in statements if not callable(s)) if m]
+    if not names:
+        return
+    invalid = (await conn.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+    ), {"names": names})).scalars().all()
+    for name in invalid:
+        logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+        await conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+async def current_version(conn) -> int:
+    """Highest applied version; 0 for a database that predates versioning (or is empty)."""
+    try:
+        return (await conn.execute(text("SELECT max(version) FROM schema_version"))).scalar() or 0
+    except ProgrammingError as e:
+        if getattr(e.orig, "sqlstate", None) != UNDEFINED_TABLE:
+            raise
+        await conn.rollback()
+        return 0
+
+async def apply_migrations() -> int:
+    """Applies every pending migration; returns how many ran."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            # Another worker may have finished while this one waited for the lock
+            await conn.exec_driver_sql(CREATE_SCHEMA_VERSION)
+            version = await current_version(conn)
+            pending = [m for m in MIGRATIONS if m[0] > version]
+            for number, description, statements in pending:
+                logger.info(f"Applying migration {number}: {description}")
+                await drop_invalid_indexes(conn, statements)
+                for statement in statements:
+                    if callable(statement):
+                        await conn.run_sync(statement)
+                    else:
+                        await conn.exec_driver_sql(statement)
+                await conn.execute(
+                    text("INSERT INTO schema_version (version, description) VALUES (:v, :d) ON CONFLICT DO NOTHING"),
+                    {"v": number, "d": description}
+                )
+            return len(pending)
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+async def ensure_schema():
+    """
+    Startup check: one query when the schema is current, the pending migrations otherwise.
+    Raises instead of running heavy migrations against a populated database.
+    """
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+        if version >= LATEST_VERSION:
+            logger.info(f"Schema is at version {version} ({(time.perf_counter() - started) * 1000:.0f} ms check)")
+            return
+        heavy = sorted(n for n in HEAVY_MIGRATIONS if n > version)
+        if heavy and version == 0:
+            # A database without tables yet gets everything from version 1 at no cost
+            populated = (await conn.execute(text("SELECT to_regclass('timesheet_entries') IS NOT NULL"))).scalar()
+            heavy = heavy if populated else []
+    if heavy:
+        raise RuntimeError(
+            f"Schema is at version {version} and migration(s) {', '.join(map(str, heavy))} may take minutes "
+            f"on this database. Run `python -m backend.database.migrations` before starting the server."
+        )
+    logger.info(f"Schema is at version {version}, migrating to {LATEST_VERSION}")
+    applied = await apply_migrations()
+    logger.info(f"Applied {applied} migration(s) in {time.perf_counter() - started:.1f}s")
+
+async def main():
+    try:
+        applied = await apply_migrations()
+        logger.info(f"Migrations applied successfully ({applied} pending, now at version {LATEST_VERSION}).")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    asyncio.run(main())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Date, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, Date, Enum as SQLEnum, ForeignKey, Index, Integer, text
 from .db_config import Base
 from shared.schemas import UserRole, UserStatus, TimesheetStatus, WorkType
 import datetime
@@ -15,8 +15,14 @@ class User(Base):
 
 class TimesheetEntry(Base):
     __tablename__ = "timesheet_entries"
+    __table_args__ = (
+        # Every per-employee read filters on (email, week_start_date) or (email, date);
+        # both also serve lookups on email alone, so email has no index of its own
+        Index("ix_timesheet_entries_email_week_start_date", "email", "week_start_date"),
+        Index("ix_timesheet_entries_email_date", "email", "date"),
+    )
     entry_id = Column(String, primary_key=True, index=True)
-    email = Column(String, ForeignKey("users.email"), index=True)
+    email = Column(String, ForeignKey("users.email"))
     week_start_date = Column(Date, index=True)
     date = Column(Date, index=True)
     hours = Column(Float)
@@ -27,8 +33,54 @@ class TimesheetEntry(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+# Per-day running totals on TimesheetWeek, indexed by days since week_start_date
+DAY_COLUMNS = ("mon_hours", "tue_hours", "wed_hours", "thu_hours", "fri_hours", "sat_hours", "sun_hours")
+
+class TimesheetWeek(Base):
+    """Week header kept in step with timesheet_entries by every write path."""
+    __tablename__ = "timesheet_weeks"
+    __table_args__ = (
+        # Admin review queue pages through submitted weeks in (week_start_date, email) order
+        Index(
+            "ix_timesheet_weeks_submitted",
+            "week_start_date", "email",
+            postgresql_where=text("status = 'Submitted'")
+        ),
+    )
+    email = Column(String, ForeignKey("users.email"), primary_key=True)
+    week_start_date = Column(Date, primary_key=True)
+    status = Column(String, default="Draft", nullable=False) # Draft, Submitted, Approved, Denied
+    entry_count = Column(Integer, default=0, nullable=False)
+    total_hours = Column(Float, default=0.0, nullable=False)
+    billable_hours = Column(Float, default=0.0, nullable=False)
+    holiday_hours = Column(Float, default=0.0, nullable=False)
+    mon_hours = Column(Float, default=0.0, nullable=False)
+    tue_hours = Column(Float, default=0.0, nullable=False)
+    wed_hours = Column(Float, default=0.0, nullable=False)
+    thu_hours = Column(Float, default=0.0, nullable=False)
+    fri_hours = Column(Float, default=0.0, nullable=False)
+    sat_hours = Column(Float, default=0.0, nullable=False)
+    sun_hours = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def day_hours(self, day: datetime.date) -> float:
+        return getattr(self, DAY_COLUMNS[(day - self.week_start_date).days])
+
+    def add_hours(self, day: datetime.date, hours: float, work_type: str):
+        """Applies a signed hours delta for one entry to the running totals."""
+        column = DAY_COLUMNS[(day - self.week_start_date).days]
+        setattr(self, column, round(getattr(self, column) + hours, 2))
+        self.total_hours = round(self.total_hours + hours, 2)
+        if work_type == "Holiday":
+            self.holiday_hours = round(self.holiday_hours + hours, 2)
+        else:
+            self.billable_hours = round(self.billable_hours + hours, 2)
+
 class ApprovedTimesheet(Base):
     __tablename__ = "approved_timesheets"
+    __table_args__ = (
+        Index("ix_approved_timesheets_email_week_start_date", "email", "week_start_date"),
+    )
     timesheet_id = Column(String, primary_key=True)
     email = Column(String, ForeignKey("users.email"))
     week_start_date = Column(Date)
@@ -44,3 +96,20 @@ class DeniedTimesheet(Base):
     rejection_reason = Column(String)
     denied_at = Column(DateTime, default=datetime.datetime.utcnow)
     denied_by = Column(String)
+
+class AuditLog(Base):
+    """Who changed which week or entry, and how; written in batches by backend.services.audit."""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        # History of one week ("email/week_start") or entry, newest first
+        Index("ix_audit_logs_target_id_timestamp", "target_id", "timestamp"),
+    )
+    log_id = Column(String, primary_key=True)
+    # The user who made the change: the admin for reviews, the employee for their own entries and submissions
+    admin_email = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    action = Column(String, nullable=False)
+    target_id = Column(String, nullable=False)
+    old_value = Column(String)
+    new_value = Column(String)
+    reason = Column(String)
@@ -0,0 +1,102 @@
+"""
+Per-request SQL statement counts and database time.
+
+Engine events add every statement to the `QueryStats` objects active in the
+current context. `QueryStatsMiddleware` opens one per HTTP request and reports it
+in the `X-DB-Queries` and `Server-Timing` response headers; `query_budget` opens
+one around any block of code so tests can pin how many statements a route or
+`DatabaseManager` method may run.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+import time
+
+class QueryStats:
+    """Statements executed, and time spent in them, while this object was active."""
+    def __init__(self, record: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if record else None
+
+    def add(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        if self.statements is not None:
+            self.statements.append(statement)
+
+# A tuple so nested scopes (a budget inside a request) each see every statement
+_active: ContextVar[tuple] = ContextVar("query_stats", default=())
+
+@contextmanager
+def track_queries(record: bool = False):
+    """Counts the statements run in this context (and tasks it spawns) until the block exits."""
+    stats = QueryStats(record)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block"):
+    """Raises AssertionError, listing the statements, if the block runs more than max_queries."""
+    with track_queries(record=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {i}. {' '.join(s.split())[:200]}" for i, s in enumerate(stats.statements, 1))
+        raise AssertionError(f"{label} ran {stats.count} queries, budget is {max_queries}:\n{listing}")
+
+def instrument_engine(engine):
+    """Registers the counting events on an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _finish(conn, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.statement is not None:
+            _finish(context.connection, context.statement)
+
+def _finish(conn, statement: str):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    for stats in _active.get():
+        stats.add(statement, duration)
+
+class QueryStatsMiddleware:
+    """
+    Adds `X-DB-Queries` and `Server-Timing` (db and app durations, in ms) to every
+    response. Streaming responses report what ran before their headers were sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start":
+                    elapsed = (time.perf_counter() - started) * 1000
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Queries", str(stats.count))
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed:.1f}'
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
@@ -0,0 +1,192 @@
+"""
+Slow-query log with sampled EXPLAIN capture.
+
+Statements slower than SLOW_QUERY_MS are written as JSON lines to a rotating
+file (SLOW_QUERY_LOG) with their duration, redacted parameters and the
+`DatabaseManager` method that issued them. A SLOW_QUERY_EXPLAIN_SAMPLE fraction
+of slow plain SELECTs is re-run under EXPLAIN (ANALYZE, BUFFERS) in a background
+task on its own connection, one at a time per process, and the plan is logged
+next to it. Statements that write or lock rows are never explained, since
+ANALYZE executes them.
+
+Each worker process appends to the same file; rotation is not coordinated
+across processes, so a few lines can be lost around a rollover.
+"""
+from contextvars import ContextVar
+from datetime import date, datetime
+from logging.handlers import RotatingFileHandler
+from sqlalchemy import event
+from backend.config import settings
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# "DatabaseManager.<method>" for statements issued while a manager method runs
+current_operation: ContextVar[str] = ContextVar("db_operation", default="")
+
+def track_operations(cls):
+    """Class decorator: every public coroutine or async generator method labels the statements it runs."""
+    for name, fn in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if inspect.isasyncgenfunction(fn):
+            setattr(cls, name, _label_async_gen(fn, label))
+        elif inspect.iscoroutinefunction(fn):
+            setattr(cls, name, _label_coroutine(fn, label))
+    return cls
+
+def _label_coroutine(fn, label: str):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(label)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+    return wrapper
+
+def _label_async_gen(fn, label: str):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        # Set per step: a streaming response may resume the generator from another task
+        gen = fn(*args, **kwargs)
+        try:
+            while True:
+                token = current_operation.set(label)
+                try:
+                    item = await gen.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_operation.reset(token)
+                yield item
+        finally:
+            await gen.aclose()
+    return wrapper
+
+def redact(value):
+    """Keeps types, shapes, numbers and dates; hides every string (emails, names, password hashes)."""
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return f"<{type(value).__name__}>"
+
+def explainable(statement: str) -> bool:
+    """Plain reads only: EXPLAIN ANALYZE runs the statement, and a locking read could wait on its own caller."""
+    head = statement.lstrip().upper()
+    return head.startswith("SELECT") and " FOR UPDATE" not in head and " FOR SHARE" not in head
+
+_file_logger = None
+_explain_busy = False
+_explain_tasks = set()
+
+def _log(record: dict):
+    global _file_logger
+    if _file_logger is None:
+        directory = os.path.dirname(settings.SLOW_QUERY_LOG)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(settings.SLOW_QUERY_LOG, maxBytes=10 * 1024 * 1024, backupCount=5)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _file_logger = logging.getLogger("backend.slow_queries.file")
+        _file_logger.addHandler(handler)
+        _file_logger.setLevel(logging.INFO)
+        _file_logger.propagate = False
+    _file_logger.info(json.dumps(record, default=str))
+
+def instrument_slow_queries(engine):
+    """Registers the slow-query events on an (async) engine; a no-op when SLOW_QUERY_MS is 0."""
+    if settings.SLOW_QUERY_MS <= 0:
+        return
+    threshold = settings.SLOW_QUERY_MS / 1000
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _check(conn, statement, parameters, executemany, None)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        if context.connection is not None and context.statement is not None:
+            _check(context.connection, context.statement, context.parameters,
+                   context.execution_context is not None and context.execution_context.executemany,
+                   repr(context.original_exception))
+
+    def _check(conn, statement, parameters, executemany, error):
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        if duration < threshold:
+            return
+
+        operation = current_operation.get() or "unknown"
+        record = {
+            "event": "slow_query",
+            "at": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            "operation": operation,
+            "duration_ms": round(duration * 1000, 1),
+            "statement": statement,
+            "parameters": f"<{len(parameters)} rows>" if executemany else redact(parameters),
+        }
+        if error:
+            record["error"] = error
+        _log(record)
+        logger.warning(f"Slow query in {operation}: {duration * 1000:.0f} ms")
+
+        if (not executemany and not error and explainable(statement)
+                and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE):
+            _schedule_explain(engine, statement, tuple(parameters or ()), operation, duration)
+
+def _schedule_explain(engine, statement: str, parameters: tuple, operation: str, duration: float):
+    global _explain_busy
+    if _explain_busy:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _explain_busy = True
+    task = loop.create_task(_explain(engine, statement, parameters, operation, duration))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+async def _explain(engine, statement: str, parameters: tuple, operation: str, duration: float):
+    global _explain_busy
+    record = {"event": "explain", "at": datetime.now().isoformat(), "pid": os.getpid(),
+              "operation": operation, "statement": statement}
+    try:
+        # Its own connection, and the raw driver so the EXPLAIN is not itself timed and logged
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            async with raw.transaction():
+                # ANALYZE runs the query again; don't let a pathological plan run unbounded
+                timeout_ms = int(max(5000, duration * 1000 * 10))
+                await raw.execute(f"SET LOCAL statement_timeout = {timeout_ms}")
+                plan = await raw.fetchval("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, *parameters)
+        record["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        record["error"] = repr(e)
+    finally:
+        _explain_busy = False
+    _log(record)
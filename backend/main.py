@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api.routes import auth, timesheets, admin
 from backend.config import settings
+from backend.database.query_stats import QueryStatsMiddleware
+from backend.core.metrics import MetricsMiddleware, render_metrics
+from backend.services.audit import audit_log
 from datetime import datetime
 import logging
 
@@ -27,6 +30,11 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.QUERY_STATS_HEADERS:
+        app.add_middleware(QueryStatsMiddleware)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
     # Include Routers
     app.include_router(auth.router)
     app.include_router(timesheets.router)
@@ -34,12 +42,20 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     async def startup_event():
-        from backend.database.db_config import engine
-        from backend.database.models import Base
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        from backend.database.migrations import ensure_schema
+        # One version lookup when the schema is current; DDL only when a migration is pending
+        await ensure_schema()
+        audit_log.start()
         logger.info("Application started successfully.")
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        from backend.database.db_config import engine
+        # Queued audit records are written before the pool goes away
+        await audit_log.stop()
+        # Close pooled connections cleanly when a worker is recycled or the server stops
+        await engine.dispose()
+
     @app.get("/")
     async def root():
         return {"message": "Timesheet Manager API is running!"}
@@ -48,6 +64,11 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
     # Silent handlers for Streamlit internal checks to clean up logs
     @app.get("/_stcore/health")
     async def st_health():
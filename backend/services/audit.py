@@ -0,0 +1,136 @@
+"""
+Audit trail of timesheet changes, written off the request path.
+
+`audit_log.record(...)` only appends to a bounded in-process queue, so a request
+never waits on the audit insert. A background task started with the app writes
+the queue out in multi-row INSERTs as soon as AUDIT_BATCH_SIZE records are
+waiting, or AUDIT_FLUSH_INTERVAL seconds after the first of a batch arrived,
+and `stop()` drains whatever is left on shutdown. If the queue fills up because
+the database is down or falling behind, new records are dropped and counted
+instead of slowing requests down; `GET /admin/stats/audit` shows the counters.
+
+Each worker process has its own queue. Records are queued only after the change
+committed, so a worker killed without a graceful shutdown loses what it had not
+flushed yet, never records a change that did not happen.
+"""
+from sqlalchemy import insert
+from backend.config import settings
+from backend.database import models
+from backend.database.db_config import engine
+from backend.database.slow_queries import current_operation
+from datetime import datetime
+from typing import Optional
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+def snapshot(**fields) -> str:
+    """JSON text for old_value/new_value."""
+    return json.dumps(fields, default=str, sort_keys=True)
+
+class AuditLogWriter:
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list = []
+
+    def record(self, action: str, actor_email: str, target_id: str, old_value: Optional[str] = None,
+               new_value: Optional[str] = None, reason: Optional[str] = None):
+        """Queues one audit record; never blocks and never raises."""
+        row = {
+            "log_id": str(uuid.uuid4()),
+            "admin_email": actor_email,
+            "timestamp": datetime.utcnow(),
+            "action": action,
+            "target_id": target_id,
+            "old_value": old_value,
+            "new_value": new_value,
+            "reason": reason or None
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Audit queue full, {self.dropped} record(s) dropped so far")
+
+    def start(self):
+        """Starts the background writer; call from app startup, outside any request."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Writes out everything queued so far, then stops the background writer."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = self._batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            self._batch = []
+
+    async def _flush(self, rows: list):
+        token = current_operation.set("AuditLogWriter.flush")
+        try:
+            # Executed as multi-row INSERT ... VALUES statements, not one round trip per record
+            async with engine.begin() as conn:
+                await conn.execute(insert(models.AuditLog), rows)
+            self.written += len(rows)
+            self.flushes += 1
+        except Exception:
+            self.failed += len(rows)
+            logger.exception(f"Could not write {len(rows)} audit record(s)")
+        finally:
+            current_operation.reset(token)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() + len(self._batch),
+            "maxsize": self.maxsize,
+            "written": self.written,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+audit_log = AuditLogWriter(
+    maxsize=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL
+)
@@ -1,7 +1,12 @@
-from sqlalchemy import select, update, delete, and_, func
-from backend.database.db_config import AsyncSessionLocal
+from sqlalchemy import select, insert, update, delete, and_, func, tuple_, true, literal, Date, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert, aggregate_order_by, JSON
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.database import models
-from shared.schemas import TimesheetStatus, UserRole
+from backend.config import settings
+from backend.utils.cache import AsyncTTLCache
+from backend.database.slow_queries import track_operations
+from backend.services.audit import audit_log, snapshot
+from shared.schemas import TimesheetStatus, UserRole, ReviewAction
 from datetime import datetime
 import uuid
 import logging
@@ -9,347 +14,795 @@ from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
+user_cache = AsyncTTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+# Read paths select only these columns and return the rows' mappings as-is; dates
+# and datetimes are left for the JSON encoder instead of being copied into new dicts.
+ENTRY_COLUMNS = (
+    models.TimesheetEntry.entry_id,
+    models.TimesheetEntry.email,
+    models.TimesheetEntry.week_start_date,
+    models.TimesheetEntry.date,
+    models.TimesheetEntry.hours,
+    models.TimesheetEntry.project_name,
+    models.TimesheetEntry.task_description,
+    models.TimesheetEntry.status,
+    models.TimesheetEntry.created_at,
+    models.TimesheetEntry.updated_at,
+    models.TimesheetEntry.work_type
+)
+
+USER_COLUMNS = (
+    models.User.email,
+    models.User.password_hash,
+    models.User.role,
+    models.User.status,
+    models.User.full_name,
+    models.User.employee_id,
+    models.User.created_at
+)
+
+WEEK_COLUMNS = tuple(models.TimesheetWeek.__table__.columns)
+
+def _week_to_dict(week) -> dict:
+    """Week header mapping with the per-day columns folded into a date-keyed dict."""
+    from datetime import timedelta
+    result = {key: value for key, value in week.items() if key not in models.DAY_COLUMNS}
+    result["daily_hours"] = {
+        (week["week_start_date"] + timedelta(days=i)).isoformat(): week[column]
+        for i, column in enumerate(models.DAY_COLUMNS)
+    }
+    return result
+
+def _entry_audit_value(entry) -> str:
+    return snapshot(date=entry.date, hours=entry.hours, project_name=entry.project_name,
+                    task_description=entry.task_description, work_type=entry.work_type)
+
+def _week_target(email: str, week_start) -> str:
+    return f"{email}/{week_start.isoformat()}"
+
+@track_operations
 class DatabaseManager:
-    def __init__(self):
-        pass
+    """
+    Data access for one unit of work. Every call runs on the session it was built
+    with, so a request injecting it through `get_db_manager` checks out one pool
+    connection however many calls it makes. Write methods commit explicitly.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _rollback_if_open(self):
+        # A write that bailed out early must not keep its row locks for the rest of the request
+        if self.db.in_transaction():
+            await self.db.rollback()
+
+    async def _lock_week(self, email: str, week_start) -> models.TimesheetWeek:
+        """
+        Returns the week header row, locked for the rest of the transaction.
+        The no-op upsert creates the row on first use and takes the row lock in one round trip.
+        """
+        stmt = pg_insert(models.TimesheetWeek).values(email=email, week_start_date=week_start)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.TimesheetWeek.email, models.TimesheetWeek.week_start_date],
+            set_={"email": stmt.excluded.email}
+        ).returning(models.TimesheetWeek)
+        result = await self.db.scalars(stmt, execution_options={"populate_existing": True})
+        return result.one()
+
+    async def _lock_entry(self, entry_id: str, email: str):
+        """
+        Locks the entry's week header, then reads the entry under that lock. Every write
+        path takes the week lock first, so the hours read here are exactly the ones the
+        header's totals still include. Returns (week, entry, error message).
+        """
+        key = (await self.db.execute(
+            select(models.TimesheetEntry.email, models.TimesheetEntry.week_start_date).filter(
+                models.TimesheetEntry.entry_id == entry_id
+            )
+        )).one_or_none()
+        if not key: return None, None, "Entry not found"
+        if key.email != email: return None, None, "Forbidden"
+
+        week = await self._lock_week(email, key.week_start_date)
+        stmt = select(models.TimesheetEntry).filter(
+            models.TimesheetEntry.entry_id == entry_id
+        ).with_for_update().execution_options(populate_existing=True)
+        entry = (await self.db.execute(stmt)).scalar_one_or_none()
+        # Deleted while this request waited for the lock
+        if not entry: return None, None, "Entry not found"
+        return week, entry, None
 
     # --- User Logins ---
+    # User rows are read on every login and registration but almost never change,
+    # so lookups go through a per-process cache. Anything that writes a user must
+    # call _invalidate_user after it commits.
+    async def _load_user(self, column, value):
+        stmt = select(*USER_COLUMNS).filter(column == value)
+        return (await self.db.execute(stmt)).mappings().one_or_none()
+
+    def _invalidate_user(self, email: str, employee_id: Optional[str] = None):
+        user_cache.invalidate(("email", email))
+        if employee_id:
+            user_cache.invalidate(("employee_id", employee_id))
+
     async def get_user_by_email(self, email: str) -> Optional[dict]:
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.User).filter(models.User.email == email)
-                result = await db.execute(stmt)
-                user = result.scalar_one_or_none()
-                if not user: return None
-                return {
-                    "email": user.email,
-                    "password_hash": user.password_hash,
-                    "role": user.role,
-                    "status": user.status,
-                    "full_name": user.full_name,
-                    "employee_id": user.employee_id,
-                    "created_at": user.created_at.isoformat() if user.created_at else None
-                }
-            finally:
-                await db.close()
+        # Row mappings are immutable, so the cached row can be handed out as-is
+        return await user_cache.get_or_load(
+            ("email", email), lambda: self._load_user(models.User.email, email)
+        )
 
     async def get_user_by_employee_id(self, employee_id: str) -> Optional[dict]:
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.User).filter(models.User.employee_id == employee_id)
-                result = await db.execute(stmt)
-                user = result.scalar_one_or_none()
-                if not user: return None
-                return {
-                    "email": user.email,
-                    "password_hash": user.password_hash,
-                    "role": user.role,
-                    "status": user.status,
-                    "full_name": user.full_name,
-                    "employee_id": user.employee_id,
-                    "created_at": user.created_at.isoformat() if user.created_at else None
-                }
-            finally:
-                await db.close()
+        return await user_cache.get_or_load(
+            ("employee_id", employee_id), lambda: self._load_user(models.User.employee_id, employee_id)
+        )
 
     async def add_user(self, email: str, password_hash: str, role: str, full_name: str = "", employee_id: str = "", status: str = "Active"):
-        async with AsyncSessionLocal() as db:
-            try:
-                new_user = models.User(
-                    email=email,
-                    password_hash=password_hash,
-                    role=role,
-                    status=status,
-                    full_name=full_name,
-                    employee_id=employee_id
-                )
-                db.add(new_user)
-                await db.commit()
-            except Exception as e:
-                await db.rollback()
-                raise e
-            finally:
-                await db.close()
+        try:
+            new_user = models.User(
+                email=email,
+                password_hash=password_hash,
+                role=role,
+                status=status,
+                full_name=full_name,
+                employee_id=employee_id
+            )
+            self.db.add(new_user)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        self._invalidate_user(email, employee_id)
 
     # --- Timesheets ---
-    async def get_pending_entries(self, email: str, week_start: str) -> List[dict]:
+    async def get_pending_entries(self, email: str, week_start: str) -> list:
         from datetime import date
         if isinstance(week_start, str):
             week_start = date.fromisoformat(week_start)
             
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.TimesheetEntry).filter(
-                    and_(
-                        models.TimesheetEntry.email == email,
-                        models.TimesheetEntry.week_start_date == week_start
-                    )
+        stmt = select(*ENTRY_COLUMNS).filter(
+            and_(
+                models.TimesheetEntry.email == email,
+                models.TimesheetEntry.week_start_date == week_start
+            )
+        )
+        return (await self.db.execute(stmt)).mappings().all()
+
+    async def get_week_version(self, email: str, week_start) -> tuple:
+        """
+        (entry count, newest entry updated_at, header updated_at) for a week: changes
+        whenever anything get_pending_entries or get_week_summary returns changes,
+        at the cost of one aggregate over the week's entries: the (email,
+        week_start_date) index finds them, but max(updated_at) reads their heap rows.
+        """
+        from datetime import date
+        if isinstance(week_start, str):
+            week_start = date.fromisoformat(week_start)
+
+        entry_filter = and_(
+            models.TimesheetEntry.email == email,
+            models.TimesheetEntry.week_start_date == week_start
+        )
+        stmt = select(
+            select(func.count()).select_from(models.TimesheetEntry).filter(entry_filter).scalar_subquery(),
+            select(func.max(models.TimesheetEntry.updated_at)).filter(entry_filter).scalar_subquery(),
+            select(models.TimesheetWeek.updated_at).filter(
+                and_(
+                    models.TimesheetWeek.email == email,
+                    models.TimesheetWeek.week_start_date == week_start
                 )
-                result = await db.execute(stmt)
-                entries = result.scalars().all()
-                return [
-                    {
-                        "entry_id": e.entry_id,
-                        "email": e.email,
-                        "week_start_date": e.week_start_date.isoformat(),
-                        "date": e.date.isoformat(),
-                        "hours": e.hours,
-                        "project_name": e.project_name,
-                        "task_description": e.task_description,
-                        "status": e.status,
-                        "created_at": e.created_at.isoformat(),
-                        "updated_at": e.updated_at.isoformat(),
-                        "work_type": e.work_type
-                    } for e in entries
-                ]
-            finally:
-                await db.close()
+            ).scalar_subquery()
+        )
+        return tuple((await self.db.execute(stmt)).one())
+
+    async def get_week_summary(self, email: str, week_start: str) -> dict:
+        from datetime import date
+        if isinstance(week_start, str):
+            week_start = date.fromisoformat(week_start)
+
+        stmt = select(*WEEK_COLUMNS).filter(
+            and_(
+                models.TimesheetWeek.email == email,
+                models.TimesheetWeek.week_start_date == week_start
+            )
+        )
+        week = (await self.db.execute(stmt)).mappings().one_or_none()
+        if not week:
+            # Nothing saved yet; report an empty, editable week
+            week = {"email": email, "week_start_date": week_start, "status": TimesheetStatus.DRAFT, "entry_count": 0,
+                    "total_hours": 0.0, "billable_hours": 0.0, "holiday_hours": 0.0,
+                    **{column: 0.0 for column in models.DAY_COLUMNS}, "updated_at": None}
+        return _week_to_dict(week)
 
     async def save_timesheet_entry(self, entry):
-        async with AsyncSessionLocal() as db:
-            try:
-                # Cumulative validation
-                daily_stmt = select(func.sum(models.TimesheetEntry.hours)).filter(
-                    and_(
-                        models.TimesheetEntry.email == entry.email,
-                        models.TimesheetEntry.date == entry.date
-                    )
-                )
-                daily_result = await db.execute(daily_stmt)
-                daily_total = daily_result.scalar() or 0.0
+        try:
+            # Cumulative validation against the week header's running totals
+            week = await self._lock_week(entry.email, entry.week_start_date)
+            if week.status in ["Submitted", "Approved"]:
+                return False, f"Week is {week.status} and cannot be modified."
 
-                weekly_stmt = select(func.sum(models.TimesheetEntry.hours)).filter(
-                    and_(
-                        models.TimesheetEntry.email == entry.email,
-                        models.TimesheetEntry.week_start_date == entry.week_start_date
-                    )
-                )
-                weekly_result = await db.execute(weekly_stmt)
-                weekly_total = weekly_result.scalar() or 0.0
-
-                # 1. Daily Limit Check (8.0 hrs)
-                if daily_total + entry.hours > 8.0:
-                    remaining_day = max(0.0, 8.0 - daily_total)
-                    return False, f"Daily limit exceeded. You have already logged {daily_total} hrs for today. Remaining: {remaining_day} hrs."
-
-                # 2. Weekly Limit Check (40.0 hrs)
-                if weekly_total + entry.hours > 40.0:
-                    remaining_week = max(0.0, 40.0 - weekly_total)
-                    return False, f"Weekly limit exceeded. You have already logged {weekly_total} hrs this week. Remaining: {remaining_week} hrs. (Target: 40.0 hrs)"
-
-                new_entry = models.TimesheetEntry(
-                    entry_id=entry.entry_id,
-                    email=entry.email,
-                    week_start_date=entry.week_start_date,
-                    date=entry.date,
-                    hours=entry.hours,
-                    project_name=entry.project_name,
-                    task_description=entry.task_description,
-                    status=entry.status,
-                    work_type=entry.work_type
-                )
-                db.add(new_entry)
-                await db.commit()
-                return True, "Entry logged successfully"
-            except Exception as e:
-                await db.rollback()
-                return False, str(e)
-            finally:
-                await db.close()
+            daily_total = week.day_hours(entry.date)
+            weekly_total = week.total_hours
+
+            # 1. Daily Limit Check (8.0 hrs)
+            if daily_total + entry.hours > 8.0:
+                remaining_day = max(0.0, 8.0 - daily_total)
+                return False, f"Daily limit exceeded. You have already logged {daily_total} hrs for today. Remaining: {remaining_day} hrs."
+
+            # 2. Weekly Limit Check (40.0 hrs)
+            if weekly_total + entry.hours > 40.0:
+                remaining_week = max(0.0, 40.0 - weekly_total)
+                return False, f"Weekly limit exceeded. You have already logged {weekly_total} hrs this week. Remaining: {remaining_week} hrs. (Target: 40.0 hrs)"
+
+            new_entry = models.TimesheetEntry(
+                entry_id=entry.entry_id,
+                email=entry.email,
+                week_start_date=entry.week_start_date,
+                date=entry.date,
+                hours=entry.hours,
+                project_name=entry.project_name,
+                task_description=entry.task_description,
+                status=entry.status,
+                work_type=entry.work_type
+            )
+            self.db.add(new_entry)
+            week.add_hours(entry.date, entry.hours, entry.work_type)
+            week.entry_count += 1
+            await self.db.commit()
+            audit_log.record("create_entry", entry.email, entry.entry_id, new_value=_entry_audit_value(entry))
+            return True, "Entry logged successfully"
+        except Exception as e:
+            await self.db.rollback()
+            return False, str(e)
+        finally:
+            await self._rollback_if_open()
 
     async def submit_week(self, email: str, week_start: str):
         from datetime import date
         if isinstance(week_start, str):
             week_start = date.fromisoformat(week_start)
 
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.TimesheetEntry).filter(
-                    and_(
-                        models.TimesheetEntry.email == email,
-                        models.TimesheetEntry.week_start_date == week_start,
-                        models.TimesheetEntry.status.in_([TimesheetStatus.DRAFT, TimesheetStatus.DENIED])
-                    )
+        try:
+            now = datetime.utcnow()
+            week = update(models.TimesheetWeek).where(
+                and_(
+                    models.TimesheetWeek.email == email,
+                    models.TimesheetWeek.week_start_date == week_start,
+                    models.TimesheetWeek.status.in_([TimesheetStatus.DRAFT, TimesheetStatus.DENIED]),
+                    models.TimesheetWeek.entry_count > 0
                 )
-                result = await db.execute(stmt)
-                entries = result.scalars().all()
-                
-                if not entries: return False
-                
-                for e in entries:
-                    e.status = TimesheetStatus.SUBMITTED
-                    e.updated_at = datetime.utcnow()
-                
-                await db.commit()
-                return True
-            except Exception:
-                await db.rollback()
-                return False
-            finally:
-                await db.close()
-
-    async def get_all_submissions(self):
-        async with AsyncSessionLocal() as db:
-            try:
-                # Optimized Join to avoid N+1 queries
-                stmt = select(
-                    models.TimesheetEntry, 
-                    models.User.employee_id
-                ).outerjoin(
-                    models.User, 
-                    models.TimesheetEntry.email == models.User.email
-                ).filter(
-                    models.TimesheetEntry.status == TimesheetStatus.SUBMITTED
+            ).values(status=TimesheetStatus.SUBMITTED, updated_at=now).returning(
+                models.TimesheetWeek.email, models.TimesheetWeek.week_start_date
+            ).cte("week")
+            # Keep the per-entry status in step for entry-level readers, in the same statement
+            entries = update(models.TimesheetEntry).where(
+                and_(
+                    models.TimesheetEntry.email == week.c.email,
+                    models.TimesheetEntry.week_start_date == week.c.week_start_date,
+                    models.TimesheetEntry.status.in_([TimesheetStatus.DRAFT, TimesheetStatus.DENIED])
                 )
-                
-                result = await db.execute(stmt)
-                rows = result.all()
-                
-                result_list = []
-                for entry, emp_id in rows:
-                    result_list.append({
-                        "entry_id": entry.entry_id,
-                        "email": entry.email,
-                        "week_start_date": entry.week_start_date.isoformat(),
-                        "date": entry.date.isoformat(),
-                        "hours": entry.hours,
-                        "project_name": entry.project_name,
-                        "task_description": entry.task_description,
-                        "status": entry.status,
-                        "work_type": entry.work_type,
-                        "employee_id": emp_id or "Unknown"
-                    })
-                return result_list
-            finally:
-                await db.close()
+            ).values(status=TimesheetStatus.SUBMITTED, updated_at=now).returning(models.TimesheetEntry.hours).cte("entries")
+
+            stmt = select(func.count()).select_from(week).add_cte(entries)
+            if not (await self.db.execute(stmt)).scalar():
+                return False
+
+            await self.db.commit()
+            audit_log.record("submit_week", email, _week_target(email, week_start), new_value=TimesheetStatus.SUBMITTED.value)
+            return True
+        except Exception:
+            await self.db.rollback()
+            return False
+        finally:
+            await self._rollback_if_open()
+
+    def _submitted_weeks_stmt(self, after: Optional[tuple] = None, week_from=None, week_to=None,
+                              employee_id: Optional[str] = None, project: Optional[str] = None):
+        """Submitted week headers in review order, i.e. by (week_start_date, email)."""
+        week = models.TimesheetWeek
+        stmt = select(
+            week.email,
+            week.week_start_date,
+            week.total_hours,
+            models.User.employee_id
+        ).outerjoin(
+            models.User,
+            week.email == models.User.email
+        ).filter(
+            week.status == TimesheetStatus.SUBMITTED
+        )
+
+        # Keyset pagination: resume strictly after the last week of the previous page
+        if after:
+            stmt = stmt.filter(tuple_(week.week_start_date, week.email) > tuple_(*after))
+        if week_from:
+            stmt = stmt.filter(week.week_start_date >= week_from)
+        if week_to:
+            stmt = stmt.filter(week.week_start_date <= week_to)
+        if employee_id:
+            stmt = stmt.filter(models.User.employee_id == employee_id)
+        if project:
+            stmt = stmt.filter(
+                select(models.TimesheetEntry.entry_id).filter(
+                    and_(
+                        models.TimesheetEntry.email == week.email,
+                        models.TimesheetEntry.week_start_date == week.week_start_date,
+                        models.TimesheetEntry.project_name.icontains(project, autoescape=True)
+                    )
+                ).exists()
+            )
+        return stmt.order_by(week.week_start_date, week.email)
+
+    async def get_all_submissions(self, after: Optional[tuple] = None, limit: int = 50, week_from=None, week_to=None,
+                                  employee_id: Optional[str] = None, project: Optional[str] = None):
+        """
+        Returns one page of submitted entries, `limit` weeks at a time, and the
+        (week_start_date, email) key to resume from, or None on the last page.
+        """
+        weeks_stmt = self._submitted_weeks_stmt(after, week_from, week_to, employee_id, project).limit(limit + 1)
+        weeks = (await self.db.execute(weeks_stmt)).all()
+
+        next_after = None
+        if len(weeks) > limit:
+            weeks = weeks[:limit]
+            next_after = (weeks[-1].week_start_date, weeks[-1].email)
+        if not weeks:
+            return [], None
+
+        stmt = select(
+            *ENTRY_COLUMNS,
+            func.coalesce(models.User.employee_id, "Unknown").label("employee_id")
+        ).outerjoin(
+            models.User,
+            models.TimesheetEntry.email == models.User.email
+        ).filter(
+            and_(
+                tuple_(models.TimesheetEntry.email, models.TimesheetEntry.week_start_date).in_(
+                    [(w.email, w.week_start_date) for w in weeks]
+                ),
+                models.TimesheetEntry.status == TimesheetStatus.SUBMITTED
+            )
+        ).order_by(
+            models.TimesheetEntry.week_start_date,
+            models.TimesheetEntry.email,
+            models.TimesheetEntry.date
+        )
+        return (await self.db.execute(stmt)).mappings().all(), next_after
+
+    async def get_review_queue(self, after: Optional[tuple] = None, limit: int = 50, week_from=None, week_to=None,
+                               employee_id: Optional[str] = None, project: Optional[str] = None):
+        """
+        Returns one record per submitted (email, week) with its total hours and
+        entries nested, grouped and aggregated in a single SQL statement.
+        """
+        page = self._submitted_weeks_stmt(after, week_from, week_to, employee_id, project).limit(limit + 1).subquery("page")
+        entry = models.TimesheetEntry
+        entry_json = func.json_build_object(
+            "entry_id", entry.entry_id,
+            "date", entry.date,
+            "hours", entry.hours,
+            "project_name", entry.project_name,
+            "task_description", entry.task_description,
+            "work_type", entry.work_type,
+            "status", entry.status
+        )
+        stmt = select(
+            page.c.email,
+            page.c.week_start_date,
+            func.coalesce(page.c.employee_id, "Unknown").label("employee_id"),
+            func.sum(entry.hours).label("total_hours"),
+            func.json_agg(aggregate_order_by(entry_json, entry.date), type_=JSON).label("entries")
+        ).join(
+            entry,
+            and_(
+                entry.email == page.c.email,
+                entry.week_start_date == page.c.week_start_date,
+                entry.status == TimesheetStatus.SUBMITTED
+            )
+        ).group_by(
+            page.c.email, page.c.week_start_date, page.c.employee_id
+        ).order_by(
+            page.c.week_start_date, page.c.email
+        )
+
+        rows = (await self.db.execute(stmt)).mappings().all()
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (rows[-1]["week_start_date"], rows[-1]["email"])
+        return rows, next_after
+
+    async def stream_approved_entries(self, start, end, batch_size: int = 1000):
+        """
+        Yields approved entries dated within [start, end] in batches of `batch_size` rows,
+        read through a server-side cursor so memory use does not grow with the export.
+        """
+        approval = select(
+            models.ApprovedTimesheet.timesheet_id,
+            models.ApprovedTimesheet.approved_at,
+            models.ApprovedTimesheet.approved_by
+        ).filter(
+            and_(
+                models.ApprovedTimesheet.email == models.TimesheetEntry.email,
+                models.ApprovedTimesheet.week_start_date == models.TimesheetEntry.week_start_date
+            )
+        ).order_by(models.ApprovedTimesheet.approved_at.desc()).limit(1).lateral("approval")
+
+        stmt = select(
+            models.TimesheetEntry.entry_id,
+            models.User.employee_id,
+            models.TimesheetEntry.email,
+            models.TimesheetEntry.week_start_date,
+            models.TimesheetEntry.date,
+            models.TimesheetEntry.hours,
+            models.TimesheetEntry.project_name,
+            models.TimesheetEntry.task_description,
+            models.TimesheetEntry.work_type,
+            approval.c.timesheet_id,
+            approval.c.approved_at,
+            approval.c.approved_by
+        ).outerjoin(
+            models.User,
+            models.TimesheetEntry.email == models.User.email
+        ).outerjoin(
+            approval, true()
+        ).filter(
+            and_(
+                models.TimesheetEntry.status == TimesheetStatus.APPROVED,
+                models.TimesheetEntry.date >= start,
+                models.TimesheetEntry.date <= end
+            )
+        ).order_by(
+            models.TimesheetEntry.date,
+            models.TimesheetEntry.email
+        ).execution_options(yield_per=batch_size)
+
+        result = await self.db.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield partition
 
     async def process_timesheet_week(self, email: str, week_start: str, action: str, admin_email: str, reason: str = ""):
         from datetime import date
         if isinstance(week_start, str):
             week_start = date.fromisoformat(week_start)
 
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.TimesheetEntry).filter(
-                    and_(
-                        models.TimesheetEntry.email == email,
-                        models.TimesheetEntry.week_start_date == week_start
-                    )
+        try:
+            now = datetime.utcnow()
+            new_status = "Approved" if action == "Approve" else "Denied"
+            week = update(models.TimesheetWeek).where(
+                and_(
+                    models.TimesheetWeek.email == email,
+                    models.TimesheetWeek.week_start_date == week_start,
+                    models.TimesheetWeek.entry_count > 0,
+                    # As in process_timesheet_weeks: never a Draft week, never approve twice
+                    models.TimesheetWeek.status == TimesheetStatus.SUBMITTED
+                )
+            ).values(status=new_status, updated_at=now).returning(
+                models.TimesheetWeek.email, models.TimesheetWeek.week_start_date
+            ).cte("week")
+            entries = update(models.TimesheetEntry).where(
+                and_(
+                    models.TimesheetEntry.email == week.c.email,
+                    models.TimesheetEntry.week_start_date == week.c.week_start_date
                 )
-                res = await db.execute(stmt)
-                entries = res.scalars().all()
-                
-                if not entries: return False, "No entries found for this week"
-                
-                total_hours = sum(e.hours for e in entries)
-                ts_id = str(uuid.uuid4())
-                new_status = "Approved" if action == "Approve" else "Denied"
-
-                if action == "Approve":
-                    approved = models.ApprovedTimesheet(
-                        timesheet_id=ts_id,
-                        email=email,
-                        week_start_date=week_start,
-                        total_hours=total_hours,
-                        approved_by=admin_email
+            ).values(status=new_status, updated_at=now).returning(models.TimesheetEntry.hours).cte("entries")
+
+            # One statement moves the week and its entries and files the decision, with
+            # the approved total summed from the entries it just updated. HAVING drops
+            # the record when the week had nothing to process.
+            ts_id = str(uuid.uuid4())
+            if action == "Approve":
+                record = insert(models.ApprovedTimesheet).from_select(
+                    ["timesheet_id", "email", "week_start_date", "total_hours", "approved_by", "approved_at"],
+                    select(
+                        literal(ts_id), literal(email), literal(week_start, Date),
+                        func.sum(entries.c.hours), literal(admin_email), literal(now, DateTime)
+                    ).having(func.count() > 0)
+                ).returning(models.ApprovedTimesheet.timesheet_id)
+            else:
+                record = insert(models.DeniedTimesheet).from_select(
+                    ["timesheet_id", "email", "week_start_date", "rejection_reason", "denied_by", "denied_at"],
+                    select(
+                        literal(ts_id), literal(email), literal(week_start, Date),
+                        literal(reason), literal(admin_email), literal(now, DateTime)
+                    ).select_from(entries).having(func.count() > 0)
+                ).returning(models.DeniedTimesheet.timesheet_id)
+
+            result = await self.db.execute(record.add_cte(week, entries))
+            if result.scalar_one_or_none() is None:
+                # Nothing changed; only now look up why
+                status = (await self.db.execute(
+                    select(models.TimesheetWeek.status).filter(
+                        and_(
+                            models.TimesheetWeek.email == email,
+                            models.TimesheetWeek.week_start_date == week_start,
+                            models.TimesheetWeek.entry_count > 0
+                        )
                     )
-                    db.add(approved)
+                )).scalar_one_or_none()
+                if status is None:
+                    return False, "No entries found for this week"
+                return False, f"Week is {status}, not awaiting review"
+
+            await self.db.commit()
+            audit_log.record("approve_week" if action == "Approve" else "deny_week", admin_email,
+                             _week_target(email, week_start), new_value=new_status, reason=reason)
+            return True, f"Week {new_status.lower()}"
+        except Exception as e:
+            await self.db.rollback()
+            return False, str(e)
+        finally:
+            await self._rollback_if_open()
+
+    async def process_timesheet_weeks(self, decisions: list, admin_email: str) -> List[dict]:
+        """
+        Approves or denies many submitted weeks in one transaction. `decisions` are
+        WeekDecision items. Only weeks still awaiting review are processed, so a
+        decision repeated by a second admin fails instead of approving twice.
+        Returns one {email, week_start, action, success, message} per decision.
+        """
+        results = [
+            {"email": d.email, "week_start": d.week_start.isoformat(), "action": d.action.value, "success": False, "message": ""}
+            for d in decisions
+        ]
+        first_index = {}
+        for i, d in enumerate(decisions):
+            key = (d.email, d.week_start)
+            if key in first_index:
+                results[i]["message"] = "Duplicate decision for this week"
+            else:
+                first_index[key] = i
+        if not first_index:
+            return results
+
+        try:
+            # Lock every requested week in key order so overlapping bulk requests cannot deadlock
+            lock_stmt = select(
+                models.TimesheetWeek.email,
+                models.TimesheetWeek.week_start_date,
+                models.TimesheetWeek.status,
+                models.TimesheetWeek.entry_count
+            ).filter(
+                tuple_(models.TimesheetWeek.email, models.TimesheetWeek.week_start_date).in_(list(first_index))
+            ).order_by(
+                models.TimesheetWeek.email,
+                models.TimesheetWeek.week_start_date
+            ).with_for_update()
+            weeks = {(row.email, row.week_start_date): row for row in (await self.db.execute(lock_stmt)).all()}
+
+            by_status = {TimesheetStatus.APPROVED: [], TimesheetStatus.DENIED: []}
+            for key, i in first_index.items():
+                week = weeks.get(key)
+                if week is None or week.entry_count == 0:
+                    results[i]["message"] = "No entries found for this week"
+                elif week.status != TimesheetStatus.SUBMITTED:
+                    results[i]["message"] = f"Week is {week.status}, not awaiting review"
                 else:
-                    denied = models.DeniedTimesheet(
-                        timesheet_id=ts_id,
-                        email=email,
-                        week_start_date=week_start,
-                        rejection_reason=reason,
-                        denied_by=admin_email
-                    )
-                    db.add(denied)
-
-                for e in entries:
-                    e.status = new_status
-                    e.updated_at = datetime.utcnow()
-                
-                await db.commit()
-                return True, f"Week {action.lower()}d"
-            except Exception as e:
-                await db.rollback()
-                return False, str(e)
-            finally:
-                await db.close()
+                    new_status = TimesheetStatus.APPROVED if decisions[i].action == ReviewAction.APPROVE else TimesheetStatus.DENIED
+                    by_status[new_status].append(key)
 
-    async def update_timesheet_entry(self, entry_id: str, email: str, hours: float, project_name: str, task_description: str, work_type: str):
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.TimesheetEntry).filter(models.TimesheetEntry.entry_id == entry_id)
-                res = await db.execute(stmt)
-                entry = res.scalar_one_or_none()
-                if not entry: return False, "Entry not found"
-                
-                if entry.email != email: return False, "Forbidden"
-                
-                if entry.status in ["Submitted", "Approved"]:
-                    return False, f"Entry is {entry.status} and cannot be modified."
-                
-                # Cumulative validation for Update
-                daily_stmt = select(func.sum(models.TimesheetEntry.hours)).filter(
-                    and_(
-                        models.TimesheetEntry.email == email,
-                        models.TimesheetEntry.date == entry.date,
-                        models.TimesheetEntry.entry_id != entry_id
-                    )
+            now = datetime.utcnow()
+            approved_rows, denied_rows = [], []
+            for new_status, keys in by_status.items():
+                if not keys:
+                    continue
+                week_stmt = update(models.TimesheetWeek).where(
+                    tuple_(models.TimesheetWeek.email, models.TimesheetWeek.week_start_date).in_(keys)
+                ).values(status=new_status, updated_at=now).returning(
+                    models.TimesheetWeek.email,
+                    models.TimesheetWeek.week_start_date,
+                    models.TimesheetWeek.total_hours
                 )
-                daily_res = await db.execute(daily_stmt)
-                daily_total = daily_res.scalar() or 0.0
+                for email, week_start, total_hours in (await self.db.execute(week_stmt)).all():
+                    decision = decisions[first_index[(email, week_start)]]
+                    if new_status == TimesheetStatus.APPROVED:
+                        approved_rows.append({
+                            "timesheet_id": str(uuid.uuid4()), "email": email, "week_start_date": week_start,
+                            "total_hours": total_hours, "approved_by": admin_email
+                        })
+                    else:
+                        denied_rows.append({
+                            "timesheet_id": str(uuid.uuid4()), "email": email, "week_start_date": week_start,
+                            "rejection_reason": decision.reason, "denied_by": admin_email
+                        })
 
-                weekly_stmt = select(func.sum(models.TimesheetEntry.hours)).filter(
-                    and_(
-                        models.TimesheetEntry.email == email,
-                        models.TimesheetEntry.week_start_date == entry.week_start_date,
-                        models.TimesheetEntry.entry_id != entry_id
-                    )
+                # Keep the per-entry status in step for entry-level readers
+                await self.db.execute(
+                    update(models.TimesheetEntry).where(
+                        tuple_(models.TimesheetEntry.email, models.TimesheetEntry.week_start_date).in_(keys)
+                    ).values(status=new_status, updated_at=now)
                 )
-                weekly_res = await db.execute(weekly_stmt)
-                weekly_total = weekly_res.scalar() or 0.0
-
-                if daily_total + hours > 8.0:
-                    remaining_day = max(0.0, 8.0 - daily_total)
-                    return False, f"Daily limit exceeded. You have already logged {daily_total} hrs for {entry.date}. Remaining: {remaining_day} hrs."
-
-                if weekly_total + hours > 40.0:
-                    remaining_week = max(0.0, 40.0 - weekly_total)
-                    return False, f"Weekly limit exceeded. You have already logged {weekly_total} hrs for this week. Remaining: {remaining_week} hrs."
-
-                entry.hours = hours
-                entry.project_name = project_name
-                entry.task_description = task_description
-                entry.work_type = work_type
-                entry.updated_at = datetime.utcnow()
-                
-                await db.commit()
-                return True, "Entry updated successfully"
-            except Exception as e:
-                await db.rollback()
-                return False, str(e)
-            finally:
-                await db.close()
+
+            if approved_rows:
+                await self.db.execute(insert(models.ApprovedTimesheet), approved_rows)
+            if denied_rows:
+                await self.db.execute(insert(models.DeniedTimesheet), denied_rows)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            for key, i in first_index.items():
+                results[i]["success"] = False
+                results[i]["message"] = str(e)
+            return results
+        finally:
+            await self._rollback_if_open()
+
+        for new_status, keys in by_status.items():
+            for key in keys:
+                i = first_index[key]
+                results[i]["success"] = True
+                results[i]["message"] = f"Week {new_status.value.lower()}"
+                audit_log.record("approve_week" if new_status == TimesheetStatus.APPROVED else "deny_week", admin_email,
+                                 _week_target(*key), old_value=TimesheetStatus.SUBMITTED.value,
+                                 new_value=new_status.value, reason=decisions[i].reason)
+        return results
+
+    async def update_timesheet_entry(self, entry_id: str, email: str, hours: float, project_name: str, task_description: str, work_type: str):
+        try:
+            week, entry, error = await self._lock_entry(entry_id, email)
+            if error: return False, error
+
+            # The header is the source of truth; a Draft entry can sit in a Submitted week
+            if week.status in ["Submitted", "Approved"]:
+                return False, f"Week is {week.status} and cannot be modified."
+
+            # Cumulative validation for Update, excluding this entry's current hours
+            daily_total = round(week.day_hours(entry.date) - entry.hours, 2)
+            weekly_total = round(week.total_hours - entry.hours, 2)
+
+            if daily_total + hours > 8.0:
+                remaining_day = max(0.0, 8.0 - daily_total)
+                return False, f"Daily limit exceeded. You have already logged {daily_total} hrs for {entry.date}. Remaining: {remaining_day} hrs."
+
+            if weekly_total + hours > 40.0:
+                remaining_week = max(0.0, 40.0 - weekly_total)
+                return False, f"Weekly limit exceeded. You have already logged {weekly_total} hrs for this week. Remaining: {remaining_week} hrs."
+
+            old_value = _entry_audit_value(entry)
+            week.add_hours(entry.date, -entry.hours, entry.work_type)
+            week.add_hours(entry.date, hours, work_type)
+
+            entry.hours = hours
+            entry.project_name = project_name
+            entry.task_description = task_description
+            entry.work_type = work_type
+            entry.updated_at = datetime.utcnow()
+
+            await self.db.commit()
+            audit_log.record("update_entry", email, entry_id, old_value=old_value, new_value=_entry_audit_value(entry))
+            return True, "Entry updated successfully"
+        except Exception as e:
+            await self.db.rollback()
+            return False, str(e)
+        finally:
+            await self._rollback_if_open()
 
     async def delete_timesheet_entry(self, entry_id: str, email: str):
-        async with AsyncSessionLocal() as db:
-            try:
-                stmt = select(models.TimesheetEntry).filter(models.TimesheetEntry.entry_id == entry_id)
-                res = await db.execute(stmt)
-                entry = res.scalar_one_or_none()
-                if not entry: return False, "Entry not found"
-                
-                if entry.email != email: return False, "Forbidden"
-                
+        try:
+            week, entry, error = await self._lock_entry(entry_id, email)
+            if error: return False, error
+
+            if week.status in ["Submitted", "Approved"]:
+                return False, f"Week is {week.status} and cannot be modified."
+
+            week.add_hours(entry.date, -entry.hours, entry.work_type)
+            week.entry_count -= 1
+            old_value = _entry_audit_value(entry)
+
+            await self.db.delete(entry)
+            await self.db.commit()
+            audit_log.record("delete_entry", email, entry_id, old_value=old_value)
+            return True, "Entry deleted"
+        except Exception as e:
+            await self.db.rollback()
+            return False, str(e)
+        finally:
+            await self._rollback_if_open()
+
+    async def save_week_batch(self, email: str, week_start, creates: list, updates: list, deletes: list):
+        """
+        Applies every create, update and delete for one week in a single transaction.
+        Limits are validated once against the final state of the week.
+        """
+        from datetime import date, timedelta
+        from collections import defaultdict
+        if isinstance(week_start, str):
+            week_start = date.fromisoformat(week_start)
+
+        try:
+            # Lock the week first so concurrent saves for it serialise
+            week = await self._lock_week(email, week_start)
+            if week.status in ["Submitted", "Approved"]:
+                return False, f"Week is {week.status} and cannot be modified."
+
+            stmt = select(models.TimesheetEntry).filter(
+                and_(
+                    models.TimesheetEntry.email == email,
+                    models.TimesheetEntry.week_start_date == week_start
+                )
+            )
+            res = await self.db.execute(stmt)
+            entries = {e.entry_id: e for e in res.scalars().all()}
+
+            touched = [u.entry_id for u in updates] + list(deletes)
+            if len(touched) != len(set(touched)):
+                return False, "Each entry can only be updated or deleted once per batch."
+
+            for entry_id in touched:
+                entry = entries.get(entry_id)
+                if not entry: return False, f"Entry {entry_id} not found for this week"
                 if entry.status in ["Submitted", "Approved"]:
-                    return False, f"Cannot delete {entry.status} entries."
-
-                await db.delete(entry)
-                await db.commit()
-                return True, "Entry deleted"
-            except Exception as e:
-                await db.rollback()
-                return False, str(e)
-            finally:
-                await db.close()
+                    return False, f"Entry is {entry.status} and cannot be modified."
+
+            week_end = week_start + timedelta(days=6)
+            for c in creates:
+                if not (week_start <= c.date <= week_end):
+                    return False, f"Date {c.date} is outside the week of {week_start}"
+
+            # Cumulative validation over the final state of the week
+            final_hours = {e.entry_id: (e.date, e.hours) for e in entries.values() if e.entry_id not in deletes}
+            for u in updates:
+                final_hours[u.entry_id] = (entries[u.entry_id].date, u.hours)
+
+            daily_totals = defaultdict(float)
+            for entry_date, hours in final_hours.values():
+                daily_totals[entry_date] += hours
+            for c in creates:
+                daily_totals[c.date] += c.hours
+
+            for entry_date, total in sorted(daily_totals.items()):
+                if total > settings.MAX_DAILY_HOURS:
+                    return False, f"Daily limit exceeded. {entry_date} would total {total} hrs (max {settings.MAX_DAILY_HOURS} hrs)."
+
+            weekly_total = sum(daily_totals.values())
+            if weekly_total > settings.MAX_WEEKLY_HOURS:
+                return False, f"Weekly limit exceeded. This week would total {weekly_total} hrs (max {settings.MAX_WEEKLY_HOURS} hrs)."
+
+            now = datetime.utcnow()
+            # Taken before the changes below; recorded once the batch has committed
+            changes = [("delete_entry", entry_id, _entry_audit_value(entries[entry_id]), None) for entry_id in deletes]
+            for entry_id in deletes:
+                entry = entries[entry_id]
+                week.add_hours(entry.date, -entry.hours, entry.work_type)
+                await self.db.delete(entry)
+
+            for u in updates:
+                entry = entries[u.entry_id]
+                old_value = _entry_audit_value(entry)
+                week.add_hours(entry.date, -entry.hours, entry.work_type)
+                week.add_hours(entry.date, u.hours, u.work_type)
+                entry.hours = u.hours
+                entry.project_name = u.project_name
+                entry.task_description = u.task_description
+                entry.work_type = u.work_type
+                entry.updated_at = now
+                changes.append(("update_entry", u.entry_id, old_value, _entry_audit_value(entry)))
+
+            new_entries = [
+                models.TimesheetEntry(
+                    entry_id=str(uuid.uuid4()),
+                    email=email,
+                    week_start_date=week_start,
+                    date=c.date,
+                    hours=c.hours,
+                    project_name=c.project_name,
+                    task_description=c.task_description,
+                    status=TimesheetStatus.DRAFT,
+                    work_type=c.work_type
+                ) for c in creates
+            ]
+            self.db.add_all(new_entries)
+            for c in creates:
+                week.add_hours(c.date, c.hours, c.work_type)
+            week.entry_count += len(creates) - len(deletes)
+            changes += [("create_entry", e.entry_id, None, _entry_audit_value(e)) for e in new_entries]
+
+            await self.db.commit()
+            for action, entry_id, old_value, new_value in changes:
+                audit_log.record(action, email, entry_id, old_value=old_value, new_value=new_value)
+            return True, f"Week saved: {len(creates)} created, {len(updates)} updated, {len(deletes)} deleted"
+        except Exception as e:
+            await self.db.rollback()
+            return False, str(e)
+        finally:
+            await self._rollback_if_open()
@@ -1,3 +1,4 @@
+import base64
 from datetime import date, timedelta
 
 def get_current_week_start() -> date:
@@ -12,3 +13,16 @@ def get_available_weeks() -> list:
     for i in range(1, 5):
         weeks.append(current_start - timedelta(days=7 * i))
     return weeks
+
+def encode_cursor(week_start: date, email: str) -> str:
+    """Opaque keyset cursor for paging through weeks in (week_start_date, email) order."""
+    raw = f"{week_start.isoformat()}|{email}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        week_start, email = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return date.fromisoformat(week_start), email
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
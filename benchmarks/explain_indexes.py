@@ -0,0 +1,164 @@
+"""
+EXPLAIN-based index check for every DatabaseManager query.
+
+Seeds a throwaway local Postgres database with a few million timesheet entries,
+runs each DatabaseManager method against it while capturing the SQL it emits,
+then EXPLAINs every captured statement and fails if any of them plans a
+sequential scan over timesheet_entries or timesheet_weeks.
+
+    python benchmarks/explain_indexes.py --database-url postgresql://postgres@localhost:5432/timesheet_bench
+
+WARNING: the target database is written to. Never point this at production.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Ensure the project root is in PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHECKED_TABLES = {"timesheet_entries", "timesheet_weeks"}
+
+SEED_USERS = """
+INSERT INTO users (email, password_hash, role, status, full_name, employee_id, created_at)
+SELECT 'emp' || u || '@example.com', 'secret', 'Employee', 'Active', 'Employee ' || u, 'EMP-' || u, now()
+FROM generate_series(1, $1::int) AS u
+ON CONFLICT DO NOTHING
+"""
+
+# Two entries per weekday per week; the newest week is Draft, the one before it
+# Submitted and everything older Approved, which mirrors a live deployment.
+SEED_ENTRIES = """
+INSERT INTO timesheet_entries (entry_id, email, week_start_date, date, hours, project_name,
+                               task_description, work_type, status, created_at, updated_at)
+SELECT md5(u || '-' || w || '-' || d || '-' || n), 'emp' || u || '@example.com',
+       $2::date - 7 * w, $2::date - 7 * w + d, 4.0, 'Project ' || (u % 25), 'Seeded entry', 'Billable',
+       CASE WHEN w = 0 THEN 'Draft' WHEN w = 1 THEN 'Submitted' ELSE 'Approved' END,
+       now(), now()
+FROM generate_series(1, $1::int) AS u,
+     generate_series(0, $3::int - 1) AS w,
+     generate_series(0, 4) AS d,
+     generate_series(1, 2) AS n
+ON CONFLICT DO NOTHING
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--weeks", type=int, default=104, help="Weeks of history per employee")
+    return parser.parse_args()
+
+def seq_scans(plan: dict) -> list:
+    """Returns the relations a plan reads with a sequential scan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+async def main(args):
+    from sqlalchemy import event, text
+    from backend.database.db_config import engine, AsyncSessionLocal
+    from backend.database.models import Base
+    from backend.database.migrations import BACKFILL_TIMESHEET_WEEKS
+    from backend.services.database import DatabaseManager
+    from shared.schemas import TimesheetEntry, TimesheetEntryCreate, TimesheetEntryUpdate, TimesheetStatus, WeekDecision
+
+    today = date.today()
+    current_week = today - timedelta(days=today.weekday())
+    target_rows = args.employees * args.weeks * 10
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with engine.connect() as conn:
+        existing = (await conn.execute(text("SELECT count(*) FROM timesheet_entries"))).scalar()
+    if existing < target_rows:
+        print(f"Seeding {target_rows:,} entries for {args.employees:,} employees...")
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            await raw.execute(SEED_USERS, args.employees)
+            await raw.execute(SEED_ENTRIES, args.employees, current_week, args.weeks)
+            await raw.execute(BACKFILL_TIMESHEET_WEEKS)
+            await raw.execute("ANALYZE")
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing {existing:,} seeded entries")
+
+    captured = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith(("INSERT", "EXPLAIN")):
+            captured.append((statement, tuple(parameters or ())))
+
+    session = AsyncSessionLocal()
+    db = DatabaseManager(session)
+    email = "emp1@example.com"
+    draft_week = current_week
+    submitted_week = current_week - timedelta(days=7)
+    draft_entries = await db.get_pending_entries(email, draft_week.isoformat())
+
+    operations = [
+        ("get_user_by_email", lambda: db.get_user_by_email(email)),
+        ("get_user_by_employee_id", lambda: db.get_user_by_employee_id("EMP-1")),
+        ("get_pending_entries", lambda: db.get_pending_entries(email, draft_week.isoformat())),
+        ("get_week_summary", lambda: db.get_week_summary(email, draft_week.isoformat())),
+        ("get_week_version", lambda: db.get_week_version(email, draft_week.isoformat())),
+        ("save_timesheet_entry", lambda: db.save_timesheet_entry(TimesheetEntry(
+            entry_id="explain-check", email=email, week_start_date=draft_week, date=draft_week,
+            hours=0.0, project_name="Check", task_description="Check",
+            status=TimesheetStatus.DRAFT, created_at=datetime.now(), updated_at=datetime.now(),
+        ))),
+        ("update_timesheet_entry", lambda: db.update_timesheet_entry(
+            draft_entries[0]["entry_id"], email, 4.0, "Check", "Check", "Billable")),
+        ("save_week_batch", lambda: db.save_week_batch(
+            email, draft_week,
+            [TimesheetEntryCreate(date=draft_week, hours=0.0, project_name="Check", task_description="Check")],
+            [TimesheetEntryUpdate(entry_id=draft_entries[1]["entry_id"], hours=4.0, project_name="Check", task_description="Check")],
+            [])),
+        ("delete_timesheet_entry", lambda: db.delete_timesheet_entry("explain-check", email)),
+        ("get_all_submissions", lambda: db.get_all_submissions()),
+        ("get_review_queue", lambda: db.get_review_queue()),
+        ("submit_week", lambda: db.submit_week(email, draft_week.isoformat())),
+        ("process_timesheet_week", lambda: db.process_timesheet_week(
+            "emp2@example.com", submitted_week.isoformat(), "Approve", "admin@example.com")),
+        ("process_timesheet_weeks", lambda: db.process_timesheet_weeks(
+            [WeekDecision(email=f"emp{u}@example.com", week_start=submitted_week, action="Approve") for u in range(3, 53)],
+            "admin@example.com")),
+    ]
+
+    failures = 0
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        for name, operation in operations:
+            captured.clear()
+            await operation()
+            for statement, params in captured:
+                plan = await raw.fetchval("EXPLAIN (FORMAT JSON) " + statement, *params)
+                # SQLAlchemy registers a json codec on its asyncpg connections
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                scans = seq_scans(plan)
+                verdict = "FAIL" if scans else "ok"
+                failures += bool(scans)
+                summary = " ".join(statement.split())[:90]
+                print(f"[{verdict:>4}] {name:<26} {plan['Node Type']:<18} cost={plan['Total Cost']:<10} {summary}")
+
+    await session.close()
+    await engine.dispose()
+    if failures:
+        print(f"\n{failures} statement(s) fell back to a sequential scan.")
+        sys.exit(1)
+    print("\nAll DatabaseManager queries use an index.")
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(main(args))
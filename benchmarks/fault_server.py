@@ -0,0 +1,135 @@
+"""
+Fault-injecting stand-in for the backend API, for exercising the frontend without a database.
+
+Serves canned responses for the endpoints the Streamlit app calls and can be
+made slow, flaky or asleep:
+
+    python benchmarks/fault_server.py --port 8765                       # healthy
+    python benchmarks/fault_server.py --port 8765 --delay 2             # every response takes 2s
+    python benchmarks/fault_server.py --port 8765 --fail-rate 0.3       # 30% of calls answer 503
+    python benchmarks/fault_server.py --port 8765 --cold-start 20       # 503 for the first 20s, like a waking Render app
+    python benchmarks/fault_server.py --port 8765 --cold-start 20 --hold  # ...or hold requests until then
+
+Point the frontend at it with BACKEND_URL=http://127.0.0.1:8765.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+USER = {
+    "email": "demo@example.com",
+    "role": "Employee",
+    "status": "Active",
+    "full_name": "Demo Employee",
+    "employee_id": "EMP-1",
+    "created_at": "2026-01-01T00:00:00"
+}
+
+def week_payload(week_start: str) -> dict:
+    start = date.fromisoformat(week_start)
+    entries = [{
+        "entry_id": f"demo-{i}",
+        "email": USER["email"],
+        "week_start_date": week_start,
+        "date": (start + timedelta(days=i)).isoformat(),
+        "hours": 8.0,
+        "project_name": "Demo",
+        "task_description": "Demo work",
+        "status": "Draft",
+        "work_type": "Billable",
+        "created_at": f"{week_start}T09:00:00",
+        "updated_at": f"{week_start}T09:00:00"
+    } for i in range(3)]
+    return {
+        "week_start": week_start,
+        "week": {
+            "email": USER["email"], "week_start_date": week_start, "status": "Draft", "entry_count": 3,
+            "total_hours": 24.0, "billable_hours": 24.0, "holiday_hours": 0.0,
+            "daily_hours": {(start + timedelta(days=i)).isoformat(): 8.0 if i < 3 else 0.0 for i in range(7)},
+            "updated_at": f"{week_start}T09:00:00"
+        },
+        "entries": entries
+    }
+
+def make_handler(args, started_at: float):
+    class FaultHandler(BaseHTTPRequestHandler):
+        def log_message(self, *_):
+            pass
+
+        def _send(self, status: int, body: dict):
+            raw = json.dumps(body).encode()
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+            except (BrokenPipeError, ConnectionResetError):
+                pass # the client gave up waiting, which is the point of --hold
+
+        def _inject_faults(self) -> bool:
+            """Returns False when the request was answered with a fault."""
+            asleep_for = started_at + args.cold_start - time.monotonic()
+            if asleep_for > 0:
+                if not args.hold:
+                    self._send(503, {"detail": "Service waking up"})
+                    return False
+                time.sleep(asleep_for)
+            if args.delay:
+                time.sleep(args.delay)
+            if random.random() < args.fail_rate:
+                self._send(503, {"detail": "Injected failure"})
+                return False
+            return True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if not self._inject_faults():
+                return
+            if url.path in ("/", "/health"):
+                self._send(200, {"status": "healthy"})
+            elif url.path == "/timesheets/current":
+                query = parse_qs(url.query)
+                today = date.today()
+                default_week = (today - timedelta(days=today.weekday())).isoformat()
+                self._send(200, week_payload(query.get("week_start", [default_week])[0]))
+            elif url.path == "/admin/queue":
+                self._send(200, {"items": [], "next_cursor": None})
+            else:
+                self._send(404, {"detail": "Not Found"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self._inject_faults():
+                return
+            if self.path == "/auth/login":
+                self._send(200, {"status": "success", "access_token": "demo-token", "user": USER})
+            else:
+                self._send(200, {"message": "ok"})
+
+    return FaultHandler
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--cold-start", type=float, default=0.0, help="Seconds after start during which the backend is asleep")
+    parser.add_argument("--hold", action="store_true", help="Hold requests during the cold start instead of answering 503")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args, time.monotonic()))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
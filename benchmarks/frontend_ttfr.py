@@ -0,0 +1,118 @@
+"""
+Time-to-first-render of the Streamlit frontend against a slow, flaky or sleeping backend.
+
+Each scenario starts benchmarks/fault_server.py with different faults, drives
+frontend/app.py headlessly with Streamlit's AppTest (open the login page, log
+in) and reports:
+
+  login page    how long the first script run takes
+  after login   how long the run triggered by the Login click takes to render anything
+  shows         what that run rendered: the dashboard, or the backend-waking notice
+  to dashboard  how long until the dashboard is on screen, re-trying the login
+                every --poll seconds the way a user (or the notice's auto-reload) would
+
+    python benchmarks/frontend_ttfr.py
+    python benchmarks/frontend_ttfr.py --app path/to/other/app.py   # compare another version
+
+No database is needed.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("healthy", []),
+    ("slow 2s", ["--delay", "2"]),
+    ("flaky 30%", ["--fail-rate", "0.3"]),
+    ("cold start 503 20s", ["--cold-start", "20"]),
+    ("cold start hold 20s", ["--cold-start", "20", "--hold"]),
+    ("down", None),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "frontend", "app.py"))
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between login retries")
+    parser.add_argument("--give-up", type=float, default=60.0, help="Stop waiting for the dashboard after this long")
+    return parser.parse_args()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"fault server did not start on port {port}")
+
+def shows(at) -> str:
+    if any(t.value == "Employee Dashboard" for t in at.title):
+        return "dashboard"
+    if any("waking" in i.value for i in at.info):
+        return "waking notice"
+    return "login page"
+
+def log_in(at):
+    at.text_input[0].input("demo@example.com")
+    at.text_input[1].input("secret")
+    next(b for b in at.button if b.label == "Login").click()
+    at.run()
+
+def run_scenario(args, faults):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    port = free_port()
+    server = None
+    if faults is not None:
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "benchmarks", "fault_server.py"), "--port", str(port), *faults])
+        wait_for_port(port)
+    os.environ["BACKEND_URL"] = f"http://127.0.0.1:{port}"
+    # Backend health and the HTTP session are per process; start every scenario cold
+    st.cache_resource.clear()
+    try:
+        started = time.perf_counter()
+        at = AppTest.from_file(args.app, default_timeout=600).run()
+        login_page = time.perf_counter() - started
+
+        started = time.perf_counter()
+        log_in(at)
+        after_login = time.perf_counter() - started
+        first_render = shows(at)
+
+        to_dashboard = after_login if first_render == "dashboard" else None
+        while to_dashboard is None and time.perf_counter() - started < args.give_up:
+            time.sleep(args.poll)
+            if shows(at) == "dashboard":
+                to_dashboard = time.perf_counter() - started
+                break
+            log_in(at)
+            if shows(at) == "dashboard":
+                to_dashboard = time.perf_counter() - started
+        return login_page, after_login, first_render, to_dashboard
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+def main(args):
+    sys.path.insert(0, ROOT)
+    args.app = os.path.abspath(args.app)
+    print(f"{'scenario':<22} {'login page':>10} {'after login':>12} {'shows':<15} {'to dashboard':>12}")
+    for name, faults in SCENARIOS:
+        login_page, after_login, first_render, to_dashboard = run_scenario(args, faults)
+        dashboard = f"{to_dashboard:.2f}s" if to_dashboard is not None else f">{args.give_up:.0f}s"
+        print(f"{name:<22} {login_page:>9.2f}s {after_login:>11.2f}s {first_render:<15} {dashboard:>12}")
+
+if __name__ == "__main__":
+    main(parse_args())
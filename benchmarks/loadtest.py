@@ -0,0 +1,317 @@
+"""
+HTTP load test of the backend API with a seeded dataset.
+
+Seeds a throwaway local Postgres database with --employees employees and
+--weeks weeks of history, starts the API with uvicorn or the production gunicorn
+setup (--server gunicorn, see gunicorn.conf.py) or targets --base-url,
+then runs --concurrency virtual users against it for --duration seconds:
+
+  employees  log in, open their week, save a few entries in one batch request
+             like the Save button (re-fetching the week after each save, like a
+             Streamlit rerun), submit, open it again
+  admins     open the review queue, approve (or now and then deny) a week from it,
+             or bulk-approve several (--bulk-share of reviews)
+
+and reports throughput and p50/p95/p99 latency per route. Each run works on
+weeks no previous run has touched, so results are comparable run to run.
+
+    python benchmarks/loadtest.py --database-url postgresql://postgres@localhost:5432/timesheet_bench
+    python benchmarks/loadtest.py --database-url ... --workers 4 --concurrency 100 --duration 120 --json before.json
+
+WARNING: the target database is written to. Never point this at production.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ensure the project root is in PYTHONPATH
+sys.path.append(ROOT)
+
+PASSWORD = "secret"
+ADMIN_EMAIL = "load-admin@example.com"
+
+SEED_USERS = """
+INSERT INTO users (email, password_hash, role, status, full_name, employee_id, created_at)
+SELECT 'load' || u || '@example.com', $2, 'Employee', 'Active', 'Load Employee ' || u, 'LOAD-' || u, now()
+FROM generate_series(1, $1::int) AS u
+UNION ALL
+SELECT $3, $2, 'Admin', 'Active', 'Load Admin', 'LOAD-ADMIN', now()
+ON CONFLICT DO NOTHING
+"""
+
+# One entry per weekday per week of history, all of it already approved
+SEED_ENTRIES = """
+INSERT INTO timesheet_entries (entry_id, email, week_start_date, date, hours, project_name,
+                               task_description, work_type, status, created_at, updated_at)
+SELECT md5('load-' || u || '-' || w || '-' || d), 'load' || u || '@example.com',
+       $2::date - 7 * w, $2::date - 7 * w + d, 8.0, 'Project ' || (u % 25), 'Seeded entry', 'Billable',
+       'Approved', now(), now()
+FROM generate_series(1, $1::int) AS u,
+     generate_series(1, $3::int) AS w,
+     generate_series(0, 4) AS d
+ON CONFLICT DO NOTHING
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--base-url", help="Load an already running API instead of starting one")
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn", help="How to start the API")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes when starting the API")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=52, help="Weeks of approved history per employee")
+    parser.add_argument("--concurrency", type=int, default=50, help="Virtual users")
+    parser.add_argument("--admins", type=int, default=2, help="How many of the virtual users are admins")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of load")
+    parser.add_argument("--bulk-share", type=float, default=0.2,
+                        help="Fraction of admin reviews sent as one bulk approval")
+    parser.add_argument("--bulk-size", type=int, default=10, help="Weeks per bulk approval")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean pause between a virtual user's requests")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the traffic mix")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    return parser.parse_args()
+
+async def seed(args):
+    from sqlalchemy import text
+    from backend.database.db_config import engine
+    from backend.database.migrations import BACKFILL_TIMESHEET_WEEKS, apply_migrations
+
+    today = date.today()
+    current_week = today - timedelta(days=today.weekday())
+    # Migrate like a deploy would, so the server's startup schema check finds nothing pending
+    await apply_migrations()
+    async with engine.connect() as conn:
+        existing = (await conn.execute(text("SELECT count(*) FROM users WHERE email LIKE 'load%@example.com'"))).scalar()
+        # Runs claim fresh weeks after the latest one any earlier run used
+        latest = (await conn.execute(text(
+            "SELECT max(week_start_date) FROM timesheet_weeks WHERE email LIKE 'load%@example.com'"
+        ))).scalar()
+    if existing < args.employees + 1:
+        print(f"Seeding {args.employees:,} employees x {args.weeks} weeks...")
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            await raw.execute(SEED_USERS, args.employees, PASSWORD, ADMIN_EMAIL)
+            await raw.execute(SEED_ENTRIES, args.employees, current_week, args.weeks)
+            await raw.execute(BACKFILL_TIMESHEET_WEEKS)
+            await raw.execute("ANALYZE")
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing {existing - 1:,} seeded employees")
+    await engine.dispose()
+    return max(current_week, latest or current_week) + timedelta(days=7)
+
+class Recorder:
+    """Latency samples and non-2xx counts per route."""
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client, method: str, route: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.samples[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            return None
+        self.samples[route].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+def percentile(ordered: list, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+async def pause(args):
+    if args.think:
+        await asyncio.sleep(random.expovariate(1 / args.think))
+
+async def employee(client, recorder, args, deadline: float, email: str, weeks):
+    etags = {}
+    while time.monotonic() < deadline:
+        res = await recorder.request(client, "POST", "POST /auth/login", "/auth/login",
+                                     json={"email": email, "password": PASSWORD})
+        if res is None or res.status_code != 200:
+            await asyncio.sleep(0.5)
+            continue
+        headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+        week_start = next(weeks).isoformat()
+
+        async def open_week():
+            params = {"email": email, "week_start": week_start}
+            cached = {"If-None-Match": etags[week_start]} if week_start in etags else {}
+            res = await recorder.request(client, "GET", "GET /timesheets/current", "/timesheets/current",
+                                         params=params, headers={**headers, **cached})
+            if res is not None and "ETag" in res.headers:
+                etags[week_start] = res.headers["ETag"]
+
+        await open_week()
+        for _ in range(random.randint(1, 2)):
+            if time.monotonic() >= deadline:
+                return
+            # Entries are staged client-side; the Save button sends them all in one batch
+            creates = []
+            for _ in range(random.randint(1, 5)):
+                await pause(args)
+                day = date.fromisoformat(week_start) + timedelta(days=random.randint(0, 4))
+                creates.append({
+                    "date": day.isoformat(), "hours": 1.0, "project_name": "Load test",
+                    "task_description": "Load test entry", "work_type": "Billable"
+                })
+            await recorder.request(client, "POST", "POST /timesheets/week/batch", "/timesheets/week/batch",
+                                   headers=headers, json={
+                                       "email": email, "week_start": week_start,
+                                       "creates": creates, "updates": [], "deletes": []
+                                   })
+            await open_week()
+        await pause(args)
+        await recorder.request(client, "POST", "POST /timesheets/submit", "/timesheets/submit", headers=headers,
+                               json={"email": email, "week_start": week_start})
+        await open_week()
+        await pause(args)
+
+async def admin(client, recorder, args, deadline: float):
+    headers = None
+    while time.monotonic() < deadline:
+        if headers is None:
+            res = await recorder.request(client, "POST", "POST /auth/login", "/auth/login",
+                                         json={"email": ADMIN_EMAIL, "password": PASSWORD})
+            if res is None or res.status_code != 200:
+                await asyncio.sleep(0.5)
+                continue
+            headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+        res = await recorder.request(client, "GET", "GET /admin/queue", "/admin/queue", headers=headers)
+        items = res.json()["items"] if res is not None and res.status_code == 200 else []
+        await pause(args)
+        if not items:
+            await asyncio.sleep(0.2)
+            continue
+        if random.random() < args.bulk_share:
+            # Select up to --bulk-size weeks on the page and approve them in one request
+            weeks = random.sample(items, min(len(items), args.bulk_size))
+            await recorder.request(client, "POST", "POST /admin/timesheets/process/bulk",
+                                   "/admin/timesheets/process/bulk", headers=headers, json={
+                                       "items": [
+                                           {"email": w["email"], "week_start": w["week_start_date"], "action": "Approve"}
+                                           for w in weeks
+                                       ]
+                                   })
+        else:
+            week = random.choice(items)
+            action = "Approve" if random.random() < 0.9 else "Deny"
+            await recorder.request(client, "POST", "POST /admin/timesheets/process", "/admin/timesheets/process",
+                                   headers=headers, json={
+                                       "email": week["email"], "week_start": week["week_start_date"], "action": action,
+                                       "reason": "" if action == "Approve" else "Load test"
+                                   })
+        await pause(args)
+
+def week_sequence(first_week: date, offset: int, stride: int):
+    """Every virtual employee walks its own interleaved series of unused weeks."""
+    n = offset
+    while True:
+        yield first_week + timedelta(weeks=n)
+        n += stride
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_until_healthy(client, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not become healthy")
+
+def report(recorder: Recorder, elapsed: float) -> dict:
+    routes = {}
+    for route in sorted(recorder.samples):
+        ordered = sorted(recorder.samples[route])
+        routes[route] = {
+            "requests": len(ordered),
+            "errors": recorder.errors[route],
+            "rps": len(ordered) / elapsed,
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+    total = sum(r["requests"] for r in routes.values())
+    errors = sum(r["errors"] for r in routes.values())
+
+    print(f"\n{'route':<36} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for route, r in routes.items():
+        print(f"{route:<36} {r['requests']:>9,} {r['errors']:>7,} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}")
+    print(f"\n{total:,} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, {errors:,} errors")
+    return {"elapsed_seconds": elapsed, "requests": total, "errors": errors, "rps": total / elapsed, "routes": routes}
+
+async def run(args, base_url: str, first_week: date):
+    import httpx
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await wait_until_healthy(client)
+        employees = args.concurrency - args.admins
+        print(f"Running {employees} employees and {args.admins} admins for {args.duration:.0f}s against {base_url}...")
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = random.sample(range(1, args.employees + 1), min(employees, args.employees))
+        tasks = [
+            employee(client, recorder, args, deadline, f"load{users[i % len(users)]}@example.com",
+                     week_sequence(first_week, i, employees))
+            for i in range(employees)
+        ] + [admin(client, recorder, args, deadline) for _ in range(args.admins)]
+        await asyncio.gather(*tasks)
+        return report(recorder, time.monotonic() - started)
+
+def main(args):
+    if args.seed is not None:
+        random.seed(args.seed)
+    os.environ["DATABASE_URL"] = args.database_url
+    first_week = asyncio.run(seed(args))
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        if args.server == "gunicorn":
+            command = [sys.executable, "-m", "gunicorn", "backend.main:app", "-c", "gunicorn.conf.py",
+                       "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+        else:
+            command = [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+                       "--log-level", "warning", "--no-access-log"]
+        server = subprocess.Popen(command + ["--workers", str(args.workers)], cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT})
+    try:
+        result = asyncio.run(run(args, base_url, first_week))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json_path:
+        result["config"] = {k: v for k, v in vars(args).items() if k not in ("database_url", "json_path")}
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+if __name__ == "__main__":
+    main(parse_args())
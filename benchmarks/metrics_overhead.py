@@ -0,0 +1,78 @@
+"""
+Per-request cost of the Prometheus metrics middleware.
+
+Times full requests through httpx's ASGI transport to a minimal FastAPI route,
+with and without MetricsMiddleware, in single-process mode and in the
+multiprocess (mmap file) mode used under gunicorn. No database is needed.
+
+    python benchmarks/metrics_overhead.py --requests 20000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ensure the project root is in PYTHONPATH
+sys.path.append(ROOT)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--worker", choices=["single", "multiprocess"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+async def time_requests(app, n: int) -> float:
+    import httpx
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(200):
+            await client.get("/ping")
+        started = time.perf_counter()
+        for _ in range(n):
+            await client.get("/ping")
+        return (time.perf_counter() - started) / n
+
+def build_app(with_metrics: bool):
+    from fastapi import FastAPI
+    from backend.core.metrics import MetricsMiddleware
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+def run_worker(args):
+    """Measures one mode; prometheus_client picks its storage at import, so each mode gets a fresh process."""
+    import asyncio
+    bare = asyncio.run(time_requests(build_app(False), args.requests))
+    metered = asyncio.run(time_requests(build_app(True), args.requests))
+    print(f"{bare} {metered}")
+
+def main(args):
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'mode':<14} {'without':>10} {'with':>10} {'overhead':>10}")
+    for mode in ("single", "multiprocess"):
+        env = {**os.environ, "PYTHONPATH": ROOT}
+        env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            if mode == "multiprocess":
+                env["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+            out = subprocess.run(
+                [sys.executable, __file__, "--requests", str(args.requests), "--worker", mode],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+        bare, metered = float(out[-2]), float(out[-1])
+        print(f"{mode:<14} {bare * 1e6:>7.1f} us {metered * 1e6:>7.1f} us {(metered - bare) * 1e6:>7.1f} us")
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,164 @@
+"""
+SQL statement budget per API route: fails when a change makes a route run more queries.
+
+Walks a fresh employee and admin through every route (register, login, week
+edits, submit, review queue, approve/deny, export) in-process against a
+throwaway local Postgres database. Each request runs inside `query_budget`, and
+the X-DB-Queries header the middleware reports is checked against the same count.
+
+    python benchmarks/query_budget.py --database-url postgresql://postgres@localhost:5432/timesheet_bench
+
+benchmarks/test_query_budget.py runs the same check under pytest when
+QUERY_BUDGET_DATABASE_URL is set:
+
+    QUERY_BUDGET_DATABASE_URL=postgresql://postgres@localhost:5432/timesheet_bench python -m pytest benchmarks
+
+Lower a budget when a route gets cheaper; raising one should be a deliberate
+decision in review. WARNING: the target database is written to.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import date, timedelta
+
+# Ensure the project root is in PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement each route runs")
+    return parser.parse_args()
+
+def scenario(run_id: str):
+    """(label, budget, method, path, request kwargs factory) in the order they must run."""
+    employee = f"budget-{run_id}@example.com"
+    admin = f"budget-admin-{run_id}@example.com"
+    # A week far enough out that no other run or seeded data touches it
+    week = date(2100, 1, 4) + timedelta(weeks=int(run_id, 16) % 2000)
+    other_week = week + timedelta(weeks=1)
+    state = {}
+
+    def auth(who):
+        return {"Authorization": f"Bearer {state[who]}"}
+
+    def entry_id(n):
+        return state["entries"][n]["entry_id"]
+
+    return [
+        ("register", 3, "POST", "/auth/register", lambda: {"json": {
+            "email": employee, "password": "secret", "role": "Employee", "full_name": "Budget", "employee_id": f"B-{run_id}"}}),
+        ("register admin", 3, "POST", "/auth/register", lambda: {"json": {
+            "email": admin, "password": "secret", "role": "Admin", "full_name": "Budget Admin", "employee_id": f"BA-{run_id}"}}),
+        ("login", 1, "POST", "/auth/login", lambda: {"json": {"email": employee, "password": "secret"}}),
+        ("login admin", 1, "POST", "/auth/login", lambda: {"json": {"email": admin, "password": "secret"}}),
+        ("current (empty week)", 3, "GET", "/timesheets/current", lambda: {
+            "params": {"email": employee, "week_start": week.isoformat()}, "headers": auth("employee")}),
+        ("save entry", 3, "POST", "/timesheets/entry", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "date_str": week.isoformat(), "hours": 2.0, "project_name": "A", "task_description": "a"}}),
+        ("save entry (new day)", 3, "POST", "/timesheets/entry", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "date_str": (week + timedelta(days=1)).isoformat(), "hours": 3.0,
+            "project_name": "B", "task_description": "b"}}),
+        ("current", 3, "GET", "/timesheets/current", lambda: {
+            "params": {"email": employee, "week_start": week.isoformat()}, "headers": auth("employee")}),
+        ("current (304)", 1, "GET", "/timesheets/current", lambda: {
+            "params": {"email": employee, "week_start": week.isoformat()},
+            "headers": {**auth("employee"), "If-None-Match": state["etag"]}}),
+        # Entry key lookup, week lock, entry re-read under the lock, then the writes
+        ("update entry", 5, "POST", "/timesheets/update", lambda: {"headers": auth("employee"), "json": {
+            "entry_id": entry_id(0), "email": employee, "hours": 4.0, "project_name": "A",
+            "task_description": "a", "work_type": "Billable"}}),
+        ("week batch", 5, "POST", "/timesheets/week/batch", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "week_start": week.isoformat(),
+            "creates": [{"date": (week + timedelta(days=d)).isoformat(), "hours": 1.0, "project_name": "C",
+                         "task_description": "c"} for d in range(2, 5)],
+            "updates": [{"entry_id": entry_id(1), "hours": 2.5, "project_name": "B", "task_description": "b"}],
+            "deletes": []}}),
+        ("delete entry", 5, "POST", "/timesheets/delete", lambda: {"headers": auth("employee"), "json": {
+            "entry_id": entry_id(1), "email": employee}}),
+        ("submit", 1, "POST", "/timesheets/submit", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "week_start": week.isoformat()}}),
+        ("save entry (other week)", 3, "POST", "/timesheets/entry", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "date_str": other_week.isoformat(), "hours": 1.0, "project_name": "D", "task_description": "d"}}),
+        ("submit (other week)", 1, "POST", "/timesheets/submit", lambda: {"headers": auth("employee"), "json": {
+            "email": employee, "week_start": other_week.isoformat()}}),
+        ("review queue", 1, "GET", "/admin/queue", lambda: {
+            "params": {"week_from": week.isoformat(), "week_to": other_week.isoformat()}, "headers": auth("admin")}),
+        ("submissions", 2, "GET", "/admin/submissions", lambda: {
+            "params": {"week_from": week.isoformat(), "week_to": other_week.isoformat()}, "headers": auth("admin")}),
+        ("approve", 1, "POST", "/admin/timesheets/process", lambda: {"headers": auth("admin"), "json": {
+            "email": employee, "week_start": week.isoformat(), "action": "Approve"}}),
+        ("bulk deny", 4, "POST", "/admin/timesheets/process/bulk", lambda: {"headers": auth("admin"), "json": {
+            "items": [{"email": employee, "week_start": other_week.isoformat(),
+                       "action": "Deny", "reason": "Budget check"}]}}),
+        ("export", 1, "GET", "/admin/export", lambda: {
+            "params": {"start": week.isoformat(), "end": (week + timedelta(days=6)).isoformat()}, "headers": auth("admin")}),
+    ], state
+
+async def run_budgets(verbose: bool = False) -> int:
+    """
+    Runs the scenario against DATABASE_URL, printing one line per route, and returns
+    how many routes went over budget. Raises RuntimeError when a request fails outright.
+    """
+    import httpx
+    from backend.database.db_config import engine
+    from backend.database.models import Base
+    from backend.database.query_stats import query_budget
+    from backend.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    steps, state = scenario(uuid.uuid4().hex[:8])
+    failures = 0
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://budget") as client:
+        for label, budget, method, path, make_kwargs in steps:
+            try:
+                with query_budget(budget, f"{method} {path} ({label})") as stats:
+                    res = await client.request(method, path, **make_kwargs())
+                verdict = "ok"
+            except AssertionError as e:
+                verdict = "FAIL"
+                failures += 1
+                print(e)
+            if res.status_code >= 400:
+                raise RuntimeError(f"{label}: unexpected {res.status_code} {res.text[:200]}")
+            reported = res.headers.get("X-DB-Queries")
+            if reported is not None and int(reported) > stats.count:
+                verdict = "FAIL"
+                failures += 1
+                print(f"{label}: X-DB-Queries says {reported}, counted {stats.count}")
+            print(f"[{verdict:>4}] {label:<26} {stats.count:>2} / {budget:<2} {method} {path}")
+            if verbose:
+                for statement in stats.statements:
+                    print("         " + " ".join(statement.split())[:150])
+
+            # Later steps need what earlier ones returned
+            if label == "login":
+                state["employee"] = res.json()["access_token"]
+            elif label == "login admin":
+                state["admin"] = res.json()["access_token"]
+            elif label == "current":
+                state["etag"] = res.headers["ETag"]
+                state["entries"] = res.json()["entries"]
+
+    await engine.dispose()
+    return failures
+
+async def main(args):
+    try:
+        failures = await run_budgets(args.verbose)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(2)
+    if failures:
+        print(f"\n{failures} route(s) went over their query budget.")
+        sys.exit(1)
+    print("\nEvery route is within its query budget.")
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(main(args))
@@ -0,0 +1,126 @@
+"""
+Rows/sec and peak memory of entry reads: ORM hydration vs column-projected mappings.
+
+Seeds one week with --rows timesheet entries in a throwaway local Postgres
+database and reads it back two ways:
+
+  orm       select(TimesheetEntry), hydrate every instance, copy attributes into a
+            dict with isoformat() calls (how the read paths used to work)
+  mappings  DatabaseManager.get_pending_entries: Core select of the columns,
+            returning the rows' mappings as-is
+
+    python benchmarks/read_paths.py --database-url postgresql://postgres@localhost:5432/timesheet_bench
+
+WARNING: the target database is written to. Never point this at production.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+# Ensure the project root is in PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMAIL = "read-bench@example.com"
+WEEK_START = date(2020, 1, 6)
+
+SEED_USER = """
+INSERT INTO users (email, password_hash, role, status, full_name, employee_id, created_at)
+VALUES ($1, 'secret', 'Employee', 'Active', 'Read Bench', 'READ-BENCH', now())
+ON CONFLICT DO NOTHING
+"""
+
+SEED_ENTRIES = """
+INSERT INTO timesheet_entries (entry_id, email, week_start_date, date, hours, project_name,
+                               task_description, work_type, status, created_at, updated_at)
+SELECT 'read-bench-' || n, $1, $2::date, $2::date + n % 5, 0.01, 'Project ' || (n % 25),
+       'Seeded entry ' || n, 'Billable', 'Draft', now(), now()
+FROM generate_series(1, $3::int) AS n
+ON CONFLICT DO NOTHING
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant; the best is reported")
+    return parser.parse_args()
+
+async def read_orm(session) -> list:
+    from sqlalchemy import select, and_
+    from backend.database import models
+    stmt = select(models.TimesheetEntry).filter(
+        and_(
+            models.TimesheetEntry.email == EMAIL,
+            models.TimesheetEntry.week_start_date == WEEK_START
+        )
+    )
+    entries = (await session.execute(stmt)).scalars().all()
+    return [
+        {
+            "entry_id": e.entry_id,
+            "email": e.email,
+            "week_start_date": e.week_start_date.isoformat(),
+            "date": e.date.isoformat(),
+            "hours": e.hours,
+            "project_name": e.project_name,
+            "task_description": e.task_description,
+            "status": e.status,
+            "created_at": e.created_at.isoformat(),
+            "updated_at": e.updated_at.isoformat(),
+            "work_type": e.work_type
+        } for e in entries
+    ]
+
+async def read_mappings(session) -> list:
+    from backend.services.database import DatabaseManager
+    return await DatabaseManager(session).get_pending_entries(EMAIL, WEEK_START)
+
+async def measure(read, repeat: int):
+    from backend.database.db_config import AsyncSessionLocal
+    best = None
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as session:
+            started = time.perf_counter()
+            rows = await read(session)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Peak memory of one read, measured separately so tracing does not skew the timing
+    async with AsyncSessionLocal() as session:
+        tracemalloc.start()
+        rows = await read(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(rows), best, peak
+
+async def main(args):
+    from backend.database.db_config import engine
+    from backend.database.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.execute(SEED_USER, EMAIL)
+        await raw.execute(SEED_ENTRIES, EMAIL, WEEK_START, args.rows)
+        await raw.execute("ANALYZE timesheet_entries")
+
+    results = {}
+    for name, read in (("orm", read_orm), ("mappings", read_mappings)):
+        results[name] = await measure(read, args.repeat)
+    await engine.dispose()
+
+    print(f"{'variant':<10} {'rows':>8} {'seconds':>9} {'rows/sec':>11} {'peak MiB':>9}")
+    for name, (rows, seconds, peak) in results.items():
+        print(f"{name:<10} {rows:>8,} {seconds:>9.3f} {rows / seconds:>11,.0f} {peak / 2**20:>9.1f}")
+    orm, mappings = results["orm"], results["mappings"]
+    print(f"\nmappings: {orm[1] / mappings[1]:.1f}x faster, {orm[2] / mappings[2]:.1f}x less peak memory")
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(main(args))
@@ -0,0 +1,112 @@
+"""
+Response serialisation cost for large payloads: generic encoding vs typed response models.
+
+Serves the same /timesheets/current-shaped payload of --entries rows from a
+minimal FastAPI app three ways and times full requests through httpx's ASGI
+transport:
+
+  jsonable_encoder  no response model: jsonable_encoder walks the payload, then json.dumps
+  orjson            same, rendered with ORJSONResponse (skipped if orjson is not installed)
+  response_model    CurrentWeekResponse: validated and dumped to JSON bytes by pydantic-core
+
+No database is needed.
+
+    python benchmarks/serialization.py --entries 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+
+# Ensure the project root is in PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed requests per variant; the median is reported")
+    return parser.parse_args()
+
+def make_payload(n: int) -> dict:
+    week_start = date(2026, 1, 5)
+    now = datetime(2026, 1, 5, 9, 30)
+    entries = [{
+        "entry_id": f"00000000-0000-0000-0000-{i:012d}",
+        "email": "bench@example.com",
+        "week_start_date": week_start,
+        "date": week_start + timedelta(days=i % 5),
+        "hours": 0.25,
+        "project_name": f"Project {i % 25}",
+        "task_description": f"Seeded entry {i} with a realistic description length",
+        "work_type": "Billable",
+        "status": "Draft",
+        "created_at": now,
+        "updated_at": now
+    } for i in range(n)]
+    week = {
+        "email": "bench@example.com", "week_start_date": week_start, "status": "Draft", "entry_count": n,
+        "total_hours": n * 0.25, "billable_hours": n * 0.25, "holiday_hours": 0.0,
+        "daily_hours": {(week_start + timedelta(days=i)).isoformat(): 0.0 for i in range(7)},
+        "updated_at": now
+    }
+    return {"week_start": week_start.isoformat(), "week": week, "entries": entries}
+
+def build_app(payload: dict):
+    from fastapi import FastAPI
+    from shared.schemas import CurrentWeekResponse
+
+    app = FastAPI()
+    variants = ["jsonable_encoder", "response_model"]
+
+    @app.get("/jsonable_encoder")
+    async def plain():
+        return payload
+
+    @app.get("/response_model", response_model=CurrentWeekResponse)
+    async def typed():
+        return payload
+
+    try:
+        import orjson # noqa: F401
+        from fastapi.responses import ORJSONResponse
+        variants.insert(1, "orjson")
+
+        @app.get("/orjson", response_class=ORJSONResponse)
+        async def fast_json():
+            return payload
+    except ImportError:
+        pass
+    return app, variants
+
+async def time_variant(client, path: str, repeat: int):
+    first = await client.get(path)
+    assert first.status_code == 200, first.text[:200]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await client.get(path)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2], len(first.content), first.json()
+
+async def main(args):
+    import httpx
+
+    warnings.simplefilter("ignore") # ORJSONResponse is deprecated in recent FastAPI
+    app, variants = build_app(make_payload(args.entries))
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name in variants:
+            results[name] = await time_variant(client, f"/{name}", args.repeat)
+
+    baseline, _, body = results["jsonable_encoder"]
+    print(f"{args.entries:,} entries, median of {args.repeat} requests\n")
+    print(f"{'variant':<18} {'ms':>8} {'KiB':>7} {'speed-up':>9} {'same JSON':>10}")
+    for name, (seconds, size, parsed) in results.items():
+        print(f"{name:<18} {seconds * 1000:>8.1f} {size / 1024:>7.0f} {baseline / seconds:>8.1f}x {str(parsed == body):>10}")
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
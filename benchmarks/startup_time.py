@@ -0,0 +1,168 @@
+"""
+Cold-start cost of the schema step at startup: create_all vs the schema version check.
+
+Each run starts a fresh Python process that opens the pool's first connection
+(the same for both), performs the startup schema step and then the first
+request's query:
+
+  create_all      Base.metadata.create_all in a transaction (the old startup hook)
+  create_all+rerun
+                  the old hook plus every migration statement re-run, which is what
+                  the unversioned migration script did on each deploy (the backfill
+                  and ANALYZE scan the whole entries table every time)
+  version check   ensure_schema() against an up-to-date database (the new one)
+
+On SQLAlchemy 2.x create_all checks every table with one catalog query, so the
+first and last cost the same handful of round trips; the saving is in not
+re-running migrations that have already been applied, and grows with the table.
+
+The database is reached through a local TCP proxy that adds --latency-ms of
+round-trip time, because the difference is round trips and a local socket hides
+them; Render to Neon is typically 1-5 ms in-region and far more across regions.
+
+    python benchmarks/startup_time.py --database-url postgresql://postgres@localhost:5432/timesheet_bench --latency-ms 20
+
+The database is migrated to the latest schema version first.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ensure the project root is in PYTHONPATH
+sys.path.append(ROOT)
+
+VARIANTS = ("create_all", "create_all+rerun", "version check")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Round-trip time added by the proxy")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per variant; the median is reported")
+    parser.add_argument("--worker", choices=VARIANTS, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+async def worker(variant: str):
+    """Runs inside the child process; prints connect, schema-step and first-query milliseconds."""
+    from sqlalchemy import text
+    from backend.database.db_config import engine, AsyncSessionLocal
+    from backend.database.models import Base
+    from backend.database.migrations import MIGRATIONS, ensure_schema
+
+    started = time.perf_counter()
+    async with engine.connect():
+        pass
+    connect = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if variant.startswith("create_all"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if variant == "create_all+rerun":
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for _, _, statements in MIGRATIONS:
+                for statement in statements:
+                    if not callable(statement):
+                        await conn.exec_driver_sql(statement)
+    elif variant == "version check":
+        await ensure_schema()
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("SELECT 1"))
+    first_query = time.perf_counter() - started
+    await engine.dispose()
+    print(f"{connect * 1000:.2f} {startup * 1000:.2f} {first_query * 1000:.2f}")
+
+def upstream_of(database_url: str):
+    """(unix socket path, None) or (host, port) that the proxy forwards to."""
+    from sqlalchemy.engine import make_url
+    url = make_url(database_url)
+    socket_dir = url.query.get("host")
+    if socket_dir:
+        return os.path.join(socket_dir, f".s.PGSQL.{url.port or 5432}"), None
+    return url.host or "localhost", url.port or 5432
+
+def proxied_url(database_url: str, port: int) -> str:
+    from sqlalchemy.engine import make_url
+    url = make_url(database_url)
+    url = url.set(host="127.0.0.1", port=port, query={k: v for k, v in url.query.items() if k != "host"})
+    return url.render_as_string(hide_password=False)
+
+async def start_proxy(upstream, delay: float):
+    """TCP proxy delaying each direction by `delay` seconds without serialising pipelined traffic."""
+    async def pipe(reader, writer):
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                if data is None:
+                    break
+                await asyncio.sleep(max(0.0, due - time.monotonic()))
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while data := await reader.read(65536):
+                queue.put_nowait((time.monotonic() + delay, data))
+        finally:
+            queue.put_nowait((0, None))
+            await delivery
+
+    async def handle(client_reader, client_writer):
+        host, port = upstream
+        if port is None:
+            server_reader, server_writer = await asyncio.open_unix_connection(host)
+        else:
+            server_reader, server_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer),
+                             return_exceptions=True)
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+async def main(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    from backend.database.migrations import apply_migrations
+    from backend.database.db_config import engine
+    await apply_migrations()
+    await engine.dispose()
+
+    server, port = await start_proxy(upstream_of(args.database_url), args.latency_ms / 2000)
+    env = {**os.environ, "DATABASE_URL": proxied_url(args.database_url, port), "PYTHONPATH": ROOT,
+           "SLOW_QUERY_MS": "0"}
+    results = {variant: [] for variant in VARIANTS}
+    for _ in range(args.runs):
+        for variant in VARIANTS:
+            child = await asyncio.create_subprocess_exec(
+                sys.executable, __file__, "--database-url", args.database_url, "--worker", variant,
+                env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            out, _ = await child.communicate()
+            results[variant].append(tuple(map(float, out.decode().split()[-3:])))
+    server.close()
+
+    print(f"{args.latency_ms:.0f} ms round trip, median of {args.runs} cold starts\n")
+    print(f"{'startup step':<18} {'connect ms':>11} {'schema ms':>10} {'first query ms':>15} {'to first query ms':>18}")
+    totals = {}
+    for variant, samples in results.items():
+        connect, startup, first = (statistics.median(column) for column in zip(*samples))
+        totals[variant] = statistics.median(sum(sample) for sample in samples)
+        print(f"{variant:<18} {connect:>11.1f} {startup:>10.1f} {first:>15.1f} {totals[variant]:>18.1f}")
+    saved = totals["create_all+rerun"] - totals["version check"]
+    print(f"\nAgainst create_all plus re-run migrations, the version check saves {saved:.0f} ms per deploy.")
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.worker:
+        asyncio.run(worker(args.worker))
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,24 @@
+"""
+Enforces the per-route SQL statement budgets of benchmarks/query_budget.py under pytest.
+
+Skipped unless QUERY_BUDGET_DATABASE_URL names a throwaway local Postgres database,
+which is written to:
+
+    QUERY_BUDGET_DATABASE_URL=postgresql://postgres@localhost:5432/timesheet_bench python -m pytest benchmarks
+"""
+import os
+
+import pytest
+
+DATABASE_URL = os.getenv("QUERY_BUDGET_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="QUERY_BUDGET_DATABASE_URL is not set")
+
+@pytest.mark.asyncio
+async def test_routes_stay_within_query_budget():
+    # The backend reads DATABASE_URL when it is first imported
+    os.environ["DATABASE_URL"] = DATABASE_URL
+    from query_budget import run_budgets
+
+    failures = await run_budgets()
+    assert failures == 0, f"{failures} route(s) went over their query budget"
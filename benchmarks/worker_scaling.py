@@ -0,0 +1,67 @@
+"""
+Throughput of the production gunicorn setup with 1 worker vs N workers.
+
+Runs benchmarks/loadtest.py once per worker count against the same seeded
+dataset, starting the API through gunicorn.conf.py each time, and compares
+req/s and p95/p99 latency. N defaults to the worker count gunicorn.conf.py
+derives from the available cores; on a single-core machine pass --workers to
+see the cost of oversubscribing instead.
+
+    python benchmarks/worker_scaling.py --database-url postgresql://postgres@localhost:5432/timesheet_bench
+    python benchmarks/worker_scaling.py --database-url ... --workers 1 2 4 --concurrency 100 --duration 60
+
+WARNING: the target database is written to. Never point this at production.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Ensure the project root is in PYTHONPATH
+sys.path.append(ROOT)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Throwaway local Postgres database")
+    parser.add_argument("--workers", type=int, nargs="+", help="Worker counts to compare (default: 1 and the core-derived count)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load per worker count")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic mix")
+    return parser.parse_args()
+
+def default_workers() -> list:
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", os.path.join(ROOT, "gunicorn.conf.py"))
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    return sorted({1, conf.available_cores()})
+
+def main(args):
+    counts = args.workers or default_workers()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in counts:
+            print(f"\n=== {workers} worker(s) ===")
+            path = os.path.join(tmp, f"{workers}.json")
+            env = {**os.environ, "PYTHONPATH": ROOT, "PROMETHEUS_MULTIPROC_DIR": os.path.join(tmp, f"metrics-{workers}")}
+            subprocess.run(
+                [sys.executable, os.path.join(ROOT, "benchmarks", "loadtest.py"), "--database-url", args.database_url,
+                 "--server", "gunicorn", "--workers", str(workers), "--concurrency", str(args.concurrency),
+                 "--duration", str(args.duration), "--seed", str(args.seed), "--json", path],
+                env=env, check=True
+            )
+            with open(path) as f:
+                results[workers] = json.load(f)
+
+    baseline = results[counts[0]]["rps"]
+    print(f"\n{'workers':>7} {'req/s':>9} {'speedup':>8} {'errors':>7} {'worst p95 ms':>13} {'worst p99 ms':>13}")
+    for workers, result in results.items():
+        routes = result["routes"].values()
+        print(f"{workers:>7} {result['rps']:>9.1f} {result['rps'] / baseline:>7.2f}x {result['errors']:>7,} "
+              f"{max(r['p95_ms'] for r in routes):>13.1f} {max(r['p99_ms'] for r in routes):>13.1f}")
+
+if __name__ == "__main__":
+    main(parse_args())
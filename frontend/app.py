@@ -1,6 +1,10 @@
 import streamlit as st
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
 from datetime import datetime, timedelta, date
 import time
 import uuid
@@ -269,81 +273,251 @@ if "step" not in st.session_state: st.session_state.step = "login"
 if "temp_email" not in st.session_state: st.session_state.temp_email = ""
 if "otp_purpose" not in st.session_state: st.session_state.otp_purpose = ""
 if "access_token" not in st.session_state: st.session_state.access_token = None
+if "response_cache" not in st.session_state: st.session_state.response_cache = {}
+
+# Filled at the end of the run if the backend turned out to be asleep
+backend_status_slot = st.container()
+
+# --- API Helpers ---
+API_MAX_WORKERS = 4
+
+@st.cache_resource
+def get_http_session():
+    """
+    One keep-alive connection pool per Streamlit server process, shared by every
+    browser session and thread. Nothing per-user lives on it: auth headers are
+    passed per request and cookies are never stored.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=API_MAX_WORKERS * 4)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 # --- Backend Waking Logic ---
-@st.cache_data(ttl=600)
-def wake_backend():
-    """Taps the backend to wake it from Render's free tier sleep."""
-    try:
-        # Just a light ping to the root or health check
-        requests.get(BACKEND_URL.rstrip("/") + "/", timeout=5)
-    except:
-        pass
+API_TIMEOUT = (3.05, 15) # connect, read
+PROBE_TIMEOUT = (3.05, 60) # Render cold starts typically take 30-60 seconds
 
-# Run wake-up silently in the background
-#wake_backend()
+def jittered_backoff(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with jitter, so sessions retrying together do not stampede the backend."""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
 
-# --- API Helpers ---
-def api_call(method, endpoint, data=None, params=None, retries=6):
+class BackendHealth:
     """
-    Robust API caller with exponential backoff and long timeouts 
-    specifically designed for Render Free Tier cold starts.
+    Backend reachability shared by every session of this Streamlit process.
+
+    The first failed call opens the circuit (DOWN): api_call then fails fast
+    instead of holding the script for minutes, and a single background thread
+    probes /health with jittered backoff until the backend answers, which closes
+    the circuit again (UP).
+    """
+    UNKNOWN, UP, DOWN = "unknown", "up", "down"
+
+    def __init__(self, base_url, session):
+        self.base_url = base_url
+        self.session = session
+        self.state = self.UNKNOWN
+        self._lock = threading.Lock()
+        self._probe = None
+
+    def is_open(self):
+        return self.state == self.DOWN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.UP
+
+    def record_failure(self):
+        with self._lock:
+            self.state = self.DOWN
+        self.start_probe()
+
+    def start_probe(self):
+        with self._lock:
+            if self._probe is not None and self._probe.is_alive():
+                return
+            self._probe = threading.Thread(target=self._run_probe, name="backend-wake-probe", daemon=True)
+            self._probe.start()
+
+    def _run_probe(self):
+        attempt = 0
+        while True:
+            try:
+                res = self.session.get(self.base_url + "/health", timeout=PROBE_TIMEOUT)
+                if res.status_code == 200 and "application/json" in res.headers.get("Content-Type", ""):
+                    self.record_success()
+                    return
+            except requests.exceptions.RequestException:
+                pass
+            with self._lock:
+                self.state = self.DOWN
+            time.sleep(jittered_backoff(attempt, cap=5.0))
+            attempt += 1
+
+@st.cache_resource
+def get_backend_health():
+    return BackendHealth(BACKEND_URL.rstrip("/"), get_http_session())
+
+@st.fragment(run_every=3)
+def backend_waking_notice():
+    """Shown while the circuit is open; reloads the page once the probe sees the backend."""
+    if not get_backend_health().is_open():
+        st.rerun()
+    st.info("📡 The backend is waking up (Render free tier). This page reloads by itself as soon as it is ready.")
+
+# Wake a sleeping backend in the background on the first run of this process
+if get_backend_health().state == BackendHealth.UNKNOWN:
+    get_backend_health().start_probe()
+
+# Cached GET endpoints that a successful POST can change. Timesheet reads are only
+# dropped for the week the POST names; every admin queue page is dropped.
+CACHE_INVALIDATION = {
+    "timesheets/week/batch": ["timesheets/current"],
+    "timesheets/submit": ["timesheets/current"],
+    "admin/timesheets/process": ["admin/queue"],
+    "admin/timesheets/process/bulk": ["admin/queue"],
+}
+
+def invalidate_cached(endpoints, week_start=None):
+    """Drops cached GET responses for these endpoints, optionally only for one week."""
+    for key in list(st.session_state.response_cache):
+        _, endpoint, params = key
+        if endpoint in endpoints and (week_start is None or dict(params).get("week_start") in (None, week_start)):
+            del st.session_state.response_cache[key]
+
+def cache_key_for(method, endpoint, params=None):
+    # Keyed per user so a logout/login in the same browser session never sees stale data
+    if method != "GET":
+        return None
+    user_email = (st.session_state.user or {}).get("email")
+    return (user_email, endpoint, tuple(sorted((params or {}).items())))
+
+def request_headers(cached=None):
+    headers = {}
+    if st.session_state.access_token:
+        headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+    # Conditional GET: endpoints that send an ETag answer 304 when nothing changed
+    if cached is not None and cached["res"].headers.get("ETag"):
+        headers["If-None-Match"] = cached["res"].headers["ETag"]
+    return headers
+
+def record_response(method, endpoint, data, res, cache_key, cached, cache_ttl):
+    """Applies a response to the session cache and returns the response the caller should see."""
+    if res.status_code == 304 and cached is not None:
+        cached["expires"] = time.monotonic() + cache_ttl
+        return cached["res"]
+    if cache_key and res.status_code == 200 and "application/json" in res.headers.get("Content-Type", "") and (cache_ttl or res.headers.get("ETag")):
+        st.session_state.response_cache[cache_key] = {"res": res, "expires": time.monotonic() + cache_ttl}
+    if method == "POST" and res.status_code == 200 and endpoint in CACHE_INVALIDATION:
+        invalidate_cached(CACHE_INVALIDATION[endpoint], (data or {}).get("week_start"))
+    return res
+
+def api_call(method, endpoint, data=None, params=None, retries=2, cache_ttl=0):
+    """
+    API caller that never blocks the page on a sleeping backend (Render Free Tier
+    cold starts). While the shared circuit breaker is open it returns None at once
+    and the page shows a self-refreshing notice; transient errors get a short
+    jittered retry before the circuit opens.
+
+    GETs with a cache_ttl (seconds) are answered from the session's response cache
+    until it expires, so reruns caused by typing never reach the network.
     """
     base_url = BACKEND_URL.rstrip("/")
     final_url = f"{base_url}/{endpoint}"
-    res = None
-    
-    # Use a placeholder for the status message to keep UI clean
-    status_placeholder = st.empty()
 
+    cache_key = cache_key_for(method, endpoint, params)
+    cached = st.session_state.response_cache.get(cache_key) if cache_key else None
+    if cached is not None and time.monotonic() < cached["expires"]:
+        return cached["res"]
+
+    health = get_backend_health()
+    if health.is_open():
+        return None
+
+    session = get_http_session()
     for attempt in range(retries):
         try:
-            headers = {}
-            if st.session_state.access_token:
-                headers["Authorization"] = f"Bearer {st.session_state.access_token}"
-            
-            # Use a longer timeout on the first attempt to allow for cold start
-            # Render cold starts typically take 30-60 seconds
-            current_timeout = 60 if attempt == 0 else 25
-            
-            if attempt > 0:
-                status_placeholder.info(f"📡 Backend is waking up... Attempt {attempt+1}/{retries}")
-
             if method == "POST":
-                res = requests.post(final_url, json=data, headers=headers, timeout=current_timeout)
+                res = session.post(final_url, json=data, headers=request_headers(cached), timeout=API_TIMEOUT)
             else:
-                res = requests.get(final_url, params=params, headers=headers, timeout=current_timeout)
-            
-            # Clear the waking status if we got a response
-            status_placeholder.empty()
+                res = session.get(final_url, params=params, headers=request_headers(cached), timeout=API_TIMEOUT)
 
-            # Handle common cold-start responses (502, 503, 504 are common while booting)
+            # 502/503/504 and Render's HTML "waking up" page mean the backend is not serving yet
             content_type = res.headers.get("Content-Type", "").lower()
-            if res.status_code in [502, 503, 504] or (res.status_code == 200 and "application/json" not in content_type and endpoint != ""):
-                if attempt < retries - 1:
-                    wait_time = 5 + (attempt * 3) # Recursive exponential wait
-                    time.sleep(wait_time)
-                    continue
+            if res.status_code in [502, 503, 504] or (res.status_code == 200 and "application/json" not in content_type):
+                raise requests.exceptions.ConnectionError(f"Backend unavailable ({res.status_code})")
 
-            return res
-            
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            health.record_success()
+            return record_response(method, endpoint, data, res, cache_key, cached, cache_ttl)
+
+        except requests.exceptions.ConnectionError:
             if attempt < retries - 1:
-                wait_time = 5 + (attempt * 3)
-                time.sleep(wait_time)
+                time.sleep(jittered_backoff(attempt, base=0.5, cap=2.0))
                 continue
-            status_placeholder.empty()
-            break
+            health.record_failure()
+            return None
+        except requests.exceptions.Timeout:
+            # Already waited API_TIMEOUT; let the background probe do any further waiting
+            health.record_failure()
+            return None
         except Exception as e:
-            status_placeholder.empty()
             print(f"📡 API Exception: {e}")
-            break
-            
-    if res is None:
-        st.error(f"📡 **Backend Timeout:** The server is taking too long to wake up.")
-        st.info("Render free tier puts apps to sleep. Please wait 10 seconds and click the button again.")
-        st.divider()
-    return res
+            return None
+    return None
+
+def send_call(session, base_url, call, method, headers):
+    """Sends one prefetch call from a worker thread; None on a network error."""
+    try:
+        return session.request(
+            method, f"{base_url}/{call['endpoint']}", json=call.get("data"),
+            params=call.get("params"), headers=headers, timeout=API_TIMEOUT
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"📡 API Exception: {e}")
+        return None
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Background threads for prefetches, shared by every browser session of this process."""
+    return ThreadPoolExecutor(max_workers=API_MAX_WORKERS, thread_name_prefix="prefetch")
+
+def prefetch(calls):
+    """
+    Starts independent calls on the shared prefetch executor and returns at once;
+    collect_prefetched() adds their responses to the session cache on a later run.
+    Each call is a dict with method, endpoint and optionally data, params and
+    cache_ttl. There are no retries, calls already cached or still in flight are
+    skipped, and nothing is sent while the circuit is open.
+    """
+    if get_backend_health().is_open():
+        return
+    base_url = BACKEND_URL.rstrip("/")
+    session = get_http_session()
+    inflight = st.session_state.setdefault("prefetching", {})
+    for call in calls:
+        method = call.get("method", "GET")
+        cache_key = cache_key_for(method, call["endpoint"], call.get("params"))
+        cached = st.session_state.response_cache.get(cache_key) if cache_key else None
+        if cache_key in inflight or (cached is not None and time.monotonic() < cached["expires"]):
+            continue
+        # Headers are built here: worker threads have no access to st.session_state
+        future = get_prefetch_executor().submit(send_call, session, base_url, call, method, request_headers(cached))
+        inflight[cache_key] = (call, method, cached, future)
+
+def collect_prefetched():
+    """Adds the responses of prefetches that have finished to the session cache."""
+    inflight = st.session_state.get("prefetching", {})
+    for cache_key, (call, method, cached, future) in list(inflight.items()):
+        if not future.done():
+            continue
+        del inflight[cache_key]
+        res = future.result()
+        if res is not None:
+            record_response(method, call["endpoint"], call.get("data"), res, cache_key, cached, call.get("cache_ttl", 0))
+
+collect_prefetched()
 
 # --- UI Components ---
 
@@ -524,7 +698,7 @@ def employee_dashboard():
         st.session_state.last_week = selected_week_str
     
     # Fetch entries for selected week
-    res = api_call("GET", "timesheets/current", params={"email": st.session_state.user['email'], "week_start": selected_week_str})
+    res = api_call("GET", "timesheets/current", params={"email": st.session_state.user['email'], "week_start": selected_week_str}, cache_ttl=60)
     if res is None or res.status_code != 200:
         if res:
             try:
@@ -537,12 +711,21 @@ def employee_dashboard():
     try:
         data = res.json()
         entries = data["entries"]
+        week_status = data["week"]["status"]
     except Exception as e:
         st.error(f"❌ Error parsing timesheet data")
         return
+
+    # Warm the other selectable weeks in the background, once, so switching period is instant.
+    # Started after the page has rendered (see the router) and never waited for.
+    prefetch = [
+        {"endpoint": "timesheets/current", "params": {"email": st.session_state.user['email'], "week_start": w}, "cache_ttl": 60}
+        for w in week_options if w != selected_week_str
+    ]
+    st.session_state.prefetch = [c for c in prefetch if cache_key_for("GET", c["endpoint"], c["params"]) not in st.session_state.response_cache]
     week_start_date = datetime.strptime(selected_week_str, "%Y-%m-%d").date()
     # Check if week is locked (Submitted or Approved)
-    is_locked = any(e['status'] in ['Submitted', 'Approved'] for e in entries)
+    is_locked = week_status in ['Submitted', 'Approved']
     
     # Calculate totals including pending changes
     display_entries = entries + st.session_state.pending_changes
@@ -777,32 +960,42 @@ def employee_dashboard():
             
             if save_col.button("💾 Save", type="primary", use_container_width=True, disabled=not can_save, help=save_btn_help):
                 with st.spinner("Saving..."):
-                    success = True
-                    # 1. Save modified existing entries
-                    for mod in modified_existing:
-                        res = api_call("POST", "timesheets/update", mod)
-                        if not res or res.status_code != 200: success = False
-                    
-                    # 2. Save new drafts
-                    for draft in st.session_state.pending_changes:
-                        payload = {
-                            "email": draft['email'],
-                            "date_str": draft['date'],
-                            "hours": draft['hours'],
-                            "project_name": draft['project_name'],
-                            "task_description": draft['task_description'],
-                            "work_type": draft['work_type']
-                        }
-                        res = api_call("POST", "timesheets/entry", payload)
-                        if not res or res.status_code != 200: success = False
-                    
-                    if success:
+                    # Modified rows and new drafts go to the backend in one atomic batch
+                    payload = {
+                        "email": st.session_state.user['email'],
+                        "week_start": selected_week_str,
+                        "updates": [
+                            {
+                                "entry_id": mod['entry_id'],
+                                "hours": mod['hours'],
+                                "project_name": mod['project_name'],
+                                "task_description": mod['task_description'],
+                                "work_type": mod['work_type']
+                            } for mod in modified_existing
+                        ],
+                        "creates": [
+                            {
+                                "date": draft['date'],
+                                "hours": draft['hours'],
+                                "project_name": draft['project_name'],
+                                "task_description": draft['task_description'],
+                                "work_type": draft['work_type']
+                            } for draft in st.session_state.pending_changes
+                        ],
+                        "deletes": []
+                    }
+                    res = api_call("POST", "timesheets/week/batch", payload)
+
+                    if res is not None and res.status_code == 200:
                         st.session_state.pending_changes = []
                         st.success("All changes saved!")
                         time.sleep(1)
                         st.rerun()
-                    else:
-                        st.error("Some changes failed to save.")
+                    elif res is not None:
+                        try:
+                            st.error(f"❌ {res.json().get('detail', 'Save failed')}")
+                        except:
+                            st.error(f"❌ Server error ({res.status_code}) while saving.")
 
             # Submit Button (current_total is used for the 40h check)
             can_submit = current_total >= 40.0 and not has_pending and not modified_existing
@@ -841,35 +1034,61 @@ def admin_dashboard():
 
     st.title("Admin Dashboard")
     st.subheader("Timesheet Submissions")
-    res = api_call("GET", "admin/submissions")
+
+    # Keyset pagination: a stack of cursors, one per page visited
+    if "sub_cursors" not in st.session_state: st.session_state.sub_cursors = [None]
+
+    def reset_pages():
+        st.session_state.sub_cursors = [None]
+
+    f1, f2 = st.columns(2)
+    emp_filter = f1.text_input("Filter by Employee ID", key="filter_emp", on_change=reset_pages)
+    proj_filter = f2.text_input("Filter by Project", key="filter_proj", on_change=reset_pages)
+
+    params = {"limit": 25}
+    if st.session_state.sub_cursors[-1]: params["cursor"] = st.session_state.sub_cursors[-1]
+    if emp_filter.strip(): params["employee_id"] = emp_filter.strip()
+    if proj_filter.strip(): params["project"] = proj_filter.strip()
+
+    res = api_call("GET", "admin/queue", params=params, cache_ttl=15)
     if res is not None and res.status_code == 200:
         try:
-            subs = res.json()
+            page = res.json()
+            queue = page["items"]
+            next_cursor = page.get("next_cursor")
         except:
             st.error("❌ Failed to parse submissions data")
             return
 
-        if not subs: 
+        if not queue: 
             st.info("No submissions awaiting review.")
         else:
-            # Group by email and week_start for aggregate review
-            df = pd.DataFrame(subs)
-            grouped = df.groupby(['email', 'week_start_date', 'employee_id']).agg({
-                'hours': 'sum'
-            }).reset_index()
-            
-            for _, row in grouped.iterrows():
-                email = row['email']
-                emp_id = row['employee_id']
-                w_start = row['week_start_date']
+            if st.button(f"✅ Approve all {len(queue)} on this page", key="approve_page"):
+                res = api_call("POST", "admin/timesheets/process/bulk", {
+                    "items": [{"email": w['email'], "week_start": w['week_start_date'], "action": "Approve", "reason": "Approved"} for w in queue]
+                })
+                if res is not None and res.status_code == 200:
+                    failed = [r for r in res.json()["results"] if not r["success"]]
+                    st.success(res.json()["message"])
+                    for r in failed:
+                        st.warning(f"{r['email']} ({r['week_start']}): {r['message']}")
+                    if not failed:
+                        time.sleep(1)
+                        st.rerun()
+                elif res is not None:
+                    st.error(f"❌ Bulk approval failed ({res.status_code}).")
+
+            # One record per employee week, grouped and totalled by the backend
+            for week in queue:
+                email = week['email']
+                emp_id = week['employee_id']
+                w_start = week['week_start_date']
                 w_end = (datetime.fromisoformat(w_start) + timedelta(days=6)).date().isoformat()
                 with st.expander(f"Employee ID: **{emp_id}** ({w_start} to {w_end})"):
-                    week_entries = df[(df['email'] == email) & (df['week_start_date'] == w_start)]
-                    
                     # Display entries in a professional table
                     html_rows = []
-                    for _, entry in week_entries.iterrows():
-                        date_fmt = datetime.fromisoformat(entry['date']).strftime("%a, %b %d") if isinstance(entry['date'], str) else entry['date'].strftime("%a, %b %d")
+                    for entry in week['entries']:
+                        date_fmt = datetime.fromisoformat(entry['date']).strftime("%a, %b %d")
                         html_rows.append(f"<tr><td>{date_fmt}</td><td>{entry['hours']} hrs</td><td>{entry['project_name']}</td><td>{entry['work_type']}</td></tr>")
                     
                     st.markdown(f"""
@@ -883,7 +1102,7 @@ def admin_dashboard():
                     </table>
                     """, unsafe_allow_html=True)
                     
-                    st.markdown(f"<div style='margin-top: 10px; font-weight: 600;'>Total Hours for Week: <span style='color: #38bdf8;'>{row['hours']} hrs</span></div>", unsafe_allow_html=True)
+                    st.markdown(f"<div style='margin-top: 10px; font-weight: 600;'>Total Hours for Week: <span style='color: #38bdf8;'>{week['total_hours']} hrs</span></div>", unsafe_allow_html=True)
                     st.divider()
 
                     # Action Buttons
@@ -892,7 +1111,7 @@ def admin_dashboard():
                     if b1.button("✅ Approve", key=f"appts_{email}_{w_start}", use_container_width=True):
                         res = api_call("POST", "admin/timesheets/process", {
                             "email": email, "week_start": w_start,
-                            "action": "Approve", "admin_email": st.session_state.user['email'], "reason": "Approved"
+                            "action": "Approve", "reason": "Approved"
                         })
                         if res is not None:
                             if res.status_code == 200:
@@ -912,6 +1131,15 @@ def admin_dashboard():
                         st.session_state.reject_target = {"email": email, "week_start": w_start}
                         st.rerun()
 
+        # Pager
+        p1, p2 = st.columns(2)
+        if len(st.session_state.sub_cursors) > 1 and p1.button("⬅️ Previous", use_container_width=True):
+            st.session_state.sub_cursors.pop()
+            st.rerun()
+        if next_cursor and p2.button("Next ➡️", use_container_width=True):
+            st.session_state.sub_cursors.append(next_cursor)
+            st.rerun()
+
     # Rejection Modal (Simulated via Session State)
     if "reject_target" in st.session_state:
         target = st.session_state.reject_target
@@ -926,7 +1154,7 @@ def admin_dashboard():
             else:
                 res = api_call("POST", "admin/timesheets/process", {
                     "email": target['email'], "week_start": target['week_start'],
-                    "action": "Deny", "admin_email": st.session_state.user['email'], "reason": reason
+                    "action": "Deny", "reason": reason
                 })
                 if res is not None:
                     if res.status_code == 200:
@@ -957,3 +1185,9 @@ elif st.session_state.step == "dashboard":
         admin_dashboard()
     else: 
         employee_dashboard()
+
+if get_backend_health().is_open():
+    with backend_status_slot:
+        backend_waking_notice()
+elif st.session_state.get("prefetch"):
+    prefetch(st.session_state.pop("prefetch"))
@@ -0,0 +1,68 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+
+    gunicorn backend.main:app -c gunicorn.conf.py
+
+Every setting can be overridden with an environment variable (or on the command
+line, e.g. --workers 4). The app is preloaded once in the master and forked, so
+workers start fast and share its memory, and each worker then builds its own
+database pool (see post_fork). Size WEB_CONCURRENCY together with the pool:
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay under the Postgres limit.
+"""
+import math
+import os
+
+def available_cores() -> int:
+    """Cores this process may use, honouring CPU affinity and a cgroup v2 quota (containers)."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+worker_class = "uvicorn_worker.UvicornWorker"
+# Async workers each use a core fully, so one per core (2n+1 is for blocking sync workers)
+workers = int(os.getenv("WEB_CONCURRENCY", available_cores()))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# A worker that stops heartbeating this long is killed and replaced
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# On restart, deploy or recycling, in-flight requests get this long to finish
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Longer than the load balancer's idle timeout would be wasted; shorter drops reusable connections
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# Recycle workers to bound slow leaks; the jitter keeps them from all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+def reset_metrics_dir():
+    """Samples left by a previous run's workers would otherwise be summed into /metrics."""
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".db"):
+                os.remove(os.path.join(directory, name))
+
+# Here rather than in on_starting: preloading imports the app, and prometheus_client
+# opens its files there, before any server hook runs
+reset_metrics_dir()
+
+def post_fork(server, worker):
+    # Preloading created the engine in the master. Start each worker with a fresh, empty
+    # pool; close=False leaves any connection the master opened to the master, since
+    # closing an inherited socket from a child would break it for the parent too.
+    from backend.database.db_config import engine
+    engine.sync_engine.dispose(close=False)
+
+def child_exit(server, worker):
+    from backend.core.metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
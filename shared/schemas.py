@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date
 from enum import Enum
 
@@ -22,6 +22,10 @@ class TimesheetStatus(str, Enum):
     APPROVED = "Approved"
     DENIED = "Denied"
 
+class ReviewAction(str, Enum):
+    APPROVE = "Approve"
+    DENY = "Deny"
+
 class WorkType(str, Enum):
     REGULAR = "Billable"
     HOLIDAY = "Holiday"
@@ -64,6 +68,38 @@ class TimesheetEntry(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class TimesheetEntryCreate(BaseModel):
+    date: date
+    hours: float
+    project_name: str
+    task_description: str
+    work_type: WorkType = WorkType.REGULAR
+
+class TimesheetEntryUpdate(BaseModel):
+    entry_id: str
+    hours: float
+    project_name: str
+    task_description: str
+    work_type: WorkType = WorkType.REGULAR
+
+class WeekBatchRequest(BaseModel):
+    """All creates, updates and deletes for one week, applied atomically."""
+    email: str # Compared exactly against the token subject, so not normalised
+    week_start: date # Monday
+    creates: List[TimesheetEntryCreate] = Field(default_factory=list)
+    updates: List[TimesheetEntryUpdate] = Field(default_factory=list)
+    deletes: List[str] = Field(default_factory=list)
+
+class WeekDecision(BaseModel):
+    email: str # Matched exactly against timesheet_weeks, so not normalised
+    week_start: date
+    action: ReviewAction
+    reason: str = ""
+
+class BulkProcessRequest(BaseModel):
+    """Approve/deny decisions for many submitted weeks, applied in one transaction by the authenticated admin."""
+    items: List[WeekDecision] = Field(default_factory=list)
+
 class WeeklyTimesheetSummary(BaseModel):
     timesheet_id: str
     email: EmailStr
@@ -89,3 +125,76 @@ class AuditLog(BaseModel):
     old_value: Optional[str] = None
     new_value: Optional[str] = None
     reason: Optional[str] = None
+
+# Response models. Rows come straight from the database, so stored emails are not
+# re-validated; free-text columns the write paths do not constrain stay str.
+
+class UserProfile(BaseModel):
+    email: str
+    role: str
+    status: UserStatus
+    # Nullable in the users table
+    full_name: Optional[str] = None
+    employee_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class LoginResponse(BaseModel):
+    status: str
+    access_token: str
+    user: UserProfile
+
+class TimesheetEntryOut(BaseModel):
+    entry_id: str
+    email: str
+    week_start_date: date
+    date: date
+    hours: float
+    project_name: str
+    task_description: str
+    work_type: str
+    status: TimesheetStatus
+    created_at: datetime
+    updated_at: datetime
+
+class WeekSummary(BaseModel):
+    email: str
+    week_start_date: date
+    status: TimesheetStatus
+    entry_count: int
+    total_hours: float
+    billable_hours: float
+    holiday_hours: float
+    daily_hours: Dict[date, float]
+    updated_at: Optional[datetime] = None
+
+class CurrentWeekResponse(BaseModel):
+    week_start: date
+    week: WeekSummary
+    entries: List[TimesheetEntryOut]
+
+class SubmissionEntry(TimesheetEntryOut):
+    employee_id: Optional[str] = None
+
+class SubmissionsPage(BaseModel):
+    items: List[SubmissionEntry]
+    next_cursor: Optional[str] = None
+
+class QueueEntry(BaseModel):
+    entry_id: str
+    date: date
+    hours: float
+    project_name: str
+    task_description: str
+    work_type: str
+    status: TimesheetStatus
+
+class ReviewQueueItem(BaseModel):
+    email: str
+    week_start_date: date
+    employee_id: Optional[str] = None
+    total_hours: float
+    entries: List[QueueEntry]
+
+class ReviewQueuePage(BaseModel):
+    items: List[ReviewQueueItem]
+    next_cursor: Optional[str] = None